@@ -0,0 +1,1919 @@
+"""Deployment engine shared by the GRACE (ReplicatedGDB) and LeaderFollower deployments.
+
+Topology, compose generation, image builds, snapshot restore, staged bring-up with
+readiness probes, WAN shaping, placement and teardown are the same for every replication
+architecture; what differs (naming, the middleware image and its environment, networks,
+readiness endpoint) comes from MODE, a ReplicationMode from DeploymentCore.modes.
+Each architecture's Deployment.py sets MODE and calls main(). Paths are relative to the
+working directory, which is that architecture's directory.
+"""
+import sys
+import string
+import subprocess
+import csv
+import json
+import yaml
+import os
+import re
+from textwrap import dedent, indent
+import time
+import threading
+import glob
+import fnmatch
+import itertools
+import hashlib
+import socket
+import signal
+import struct
+import http.client
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .dockerApi import docker_client, DockerError
+
+VERBOSE = False
+BENCHMARK = False
+PATH ="DistributionConfig.json"
+PRELOAD_DATA = os.environ.get("PRELOAD_DATA", False)
+PARALLEL = 4  # replica stacks brought up concurrently
+LOG_DIR = "./Logs"
+BUILD_CONTEXT = "."
+MODE = None  # the ReplicationMode being deployed, set by Deployment.py
+IMAGE_TAGS = {}  # image name -> content-addressed tag, filled by generate_all
+SNAPSHOT_IMAGE = "alpine:3.20"  # used to copy snapshot volumes into replica volumes
+STACK_VOLUMES = {}  # stack name -> (snapshot volume, data volume), filled by generate_all
+STACK_STAGES = {}  # stack name -> ordered start-up stages, filled by generate_all
+GENERATED = {}  # compose file -> (stack name, grace.spec), filled by generate_all
+COMPOSE_WAIT = False  # legacy: start whole stacks and leave ordering to compose healthchecks
+READY_HOST = "localhost"
+READY_TIMEOUT = 300  # seconds a service may take to answer its readiness probe
+READY_BACKOFF = (0.05, 0.5)  # first and largest delay between probes
+CONVERGENCE_TIMEOUT = 600  # seconds an added replica may take to catch up
+# Protocol-level probe per database engine, run against its published protocol port.
+DB_PROBES = {
+    "neo4j": ("bolt", None),
+    "memgraph": ("bolt", None),
+    "arangodb": ("http", "/_api/version"),
+    "mongodb": ("mongo", None),
+    "janusgraph": ("tcp", None),
+}
+
+# How to import a dataset once per engine into a volume that `up` can clone (see `snapshot`).
+# data_dir is where the engine keeps its on-disk state, import_dir where PRELOAD_DATA is mounted,
+# ready/load are run with `docker exec` inside the temporary container.
+SNAPSHOT_ENGINES = {
+    "neo4j": {
+        "image": "neo4j:4.4.24",
+        "data_dir": "/data",
+        "import_dir": "/var/lib/neo4j/import",
+        "env": {
+            "NEO4J_AUTH": "none",
+            "NEO4JLABS_PLUGINS": '["apoc"]',
+            "NEO4J_apoc_import_file_enabled": "true",
+            "NEO4J_apoc_import_file_use__neo4j__config": "true",
+            "NEO4J_dbms_security_procedures_unrestricted": "apoc.*",
+        },
+        "args": [],
+        "ready": ["cypher-shell", "RETURN 1"],
+        "load": ["bash", "-c", "cypher-shell -a bolt://localhost:7687 -f /var/lib/neo4j/import/preloadNeo4j.cypher"],
+    },
+    "memgraph": {
+        "image": "memgraph/memgraph:latest",
+        "data_dir": "/var/lib/memgraph",
+        "import_dir": "/var/lib/memgraph/import",
+        "env": {},
+        # memgraph is in-memory: write a snapshot on shutdown so the volume holds the data
+        "args": ["--storage-snapshot-on-exit=true"],
+        "ready": ["bash", "-c", "echo 'RETURN 0;' | mgconsole"],
+        "load": ["bash", "-c", "cat /var/lib/memgraph/import/preloadMemgraph.cypher | mgconsole --host localhost --port 7687"],
+    },
+    "arangodb": {
+        "image": "arangodb:latest",
+        "data_dir": "/var/lib/arangodb3",
+        "import_dir": "/var/lib/arangodb/import",
+        "env": {"ARANGO_NO_AUTH": "1"},
+        "args": [],
+        "ready": ["arangosh", "--server.endpoint", "tcp://127.0.0.1:8529", "--server.authentication", "false",
+                  "--javascript.execute-string", "quit(0)"],
+        "load": ["sh", "/var/lib/arangodb/import/arangoDBImport.sh", "tcp://127.0.0.1:8529", "1"],
+    },
+    "mongodb": {
+        "image": "mongo:8.0.14-rc0",
+        "data_dir": "/data/db",
+        "import_dir": "/var/lib/mongodb/import",
+        "env": {},
+        "args": [],
+        "ready": ["mongosh", "--quiet", "--eval", "db.runCommand('ping').ok"],
+        "load": ["/var/lib/mongodb/import/mongoDBImport.sh", "localhost:27017"],
+    },
+}
+SNAPSHOT_READY_TIMEOUT = 300  # seconds to wait for the temporary database to accept queries
+
+
+# Wall-clock spans of every bring-up phase of the current run: image build, snapshot import,
+# volume clone, container creation, database healthy, preload done, app ready, WAN shaping.
+TIMELINE = []
+TIMELINE_LOCK = threading.Lock()
+TIMELINE_FILE = os.path.join(LOG_DIR, "timeline")  # written as .json and .csv
+TIMELINE_FIELDS = ["stack", "service", "phase", "start", "end", "offset", "seconds", "ok"]
+
+def record_phase(stack, service, phase, start, ok=True):
+    """Add a span from `start` (time.time()) until now to TIMELINE."""
+    end = time.time()
+    with TIMELINE_LOCK:
+        TIMELINE.append({"stack": stack, "service": service, "phase": phase,
+                         "start": start, "end": end, "seconds": end - start, "ok": ok})
+
+def write_timeline(path=TIMELINE_FILE):
+    """Write TIMELINE to <path>.json and <path>.csv, offsets relative to the first span."""
+    if not TIMELINE:
+        return
+    origin = min(span["start"] for span in TIMELINE)
+    spans = sorted((dict(span, offset=span["start"] - origin) for span in TIMELINE), key=lambda span: span["start"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".json", "w") as f:
+        json.dump({"mode": MODE.name, "config": PATH, "origin": origin, "phases": spans}, f, indent=2)
+    with open(path + ".csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+        writer.writeheader()
+        writer.writerows(spans)
+    # the stack that finished last is the critical path of this run
+    last = max(spans, key=lambda span: span["end"])
+    chain = [span for span in spans if span["stack"] in (last["stack"], "images", "Provider")]
+    print(f"\nCritical path ({last['end'] - origin:.1f}s): "
+          + " → ".join(f"{span['service']} {span['phase']} {span['seconds']:.1f}s" for span in chain))
+    print(f"Timeline written to {path}.json and {path}.csv")
+
+def spinner(stop_event):
+    spinner_chars = ['|', '/', '-', '\\']
+    idx = 0
+    while not stop_event.is_set():
+        print('\r' + spinner_chars[idx % len(spinner_chars)] + '...', end='', flush=True)
+        idx += 1
+        time.sleep(0.1)
+    print('\r', end='')
+    
+def run_command(cmd):
+    global VERBOSE
+    if VERBOSE:
+        process = subprocess.Popen(cmd, stdout=sys.stdout, stderr=sys.stderr)
+        process.wait()
+        rc = process.returncode
+    else:
+        stop_event = threading.Event()
+        thread = threading.Thread(target=spinner, args=(stop_event,))
+        thread.start()
+
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+
+        stop_event.set()
+        thread.join()
+        rc = process.returncode
+
+        # Optionally: print output on failure or log
+        if rc != 0:
+            print(stdout.decode())
+            print(stderr.decode(), file=sys.stderr)
+    
+    if rc == 0:
+      print("✅ Done.")  
+    else:
+      print(f"❌ Command failed with code {rc}")
+    return rc
+    
+def run_logged(cmd, log_path):
+    """Run cmd with its stdout and stderr appended to log_path. Returns the exit code."""
+    with open(log_path, "a") as log:
+        log.write(f"$ {' '.join(cmd)}\n")
+        log.flush()
+        return subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT).returncode
+
+def dockerignore_patterns(context=BUILD_CONTEXT):
+    path = os.path.join(context, ".dockerignore")
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return [line.strip().strip("/") for line in f if line.strip() and not line.startswith("#")]
+
+def is_ignored(relpath, patterns):
+    parts = relpath.split("/")
+    prefixes = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    return any(fnmatch.fnmatch(p, pattern) for p in prefixes for pattern in patterns)
+
+def image_inputs(dockerfile, context=BUILD_CONTEXT):
+    """Files that end up in the image: the Dockerfile plus every COPY/ADD source, minus .dockerignore."""
+    patterns = dockerignore_patterns(context)
+    inputs = {os.path.normpath(dockerfile)}
+    with open(dockerfile) as f:
+        for line in f:
+            words = line.split()
+            if len(words) < 3 or words[0].upper() not in ("COPY", "ADD"):
+                continue
+            for source in (w for w in words[1:-1] if not w.startswith("--")):
+                for match in glob.glob(os.path.join(context, source)):
+                    if os.path.isdir(match):
+                        for root, dirs, names in os.walk(match):
+                            dirs[:] = [d for d in dirs if not is_ignored(os.path.relpath(os.path.join(root, d), context), patterns)]
+                            inputs.update(os.path.normpath(os.path.join(root, n)) for n in names)
+                    else:
+                        inputs.add(os.path.normpath(match))
+    return sorted(p for p in inputs if not is_ignored(os.path.relpath(p, context), patterns))
+
+def image_tag(name, dockerfile):
+    """Tag an image by a hash of its build inputs, so unchanged sources map to an existing image."""
+    digest = hashlib.sha256()
+    for path in image_inputs(dockerfile):
+        digest.update(os.path.relpath(path, BUILD_CONTEXT).encode() + b"\0")
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return f"{name}:{digest.hexdigest()[:12]}"
+
+def ensure_images():
+    """Build each GRACE image once per content hash; an image already tagged with that hash is reused."""
+    for name, dockerfile in MODE.images.items():
+        tag = IMAGE_TAGS.get(name) or image_tag(name, dockerfile)
+        IMAGE_TAGS[name] = tag
+        if docker_client().image_exists(tag):
+            print(f"✅ {tag} is up to date, skipping build")
+            continue
+        print(f"Building {tag} ...")
+        start = time.time()
+        rc = run_command(["docker", "build", "-f", dockerfile, "-t", tag, BUILD_CONTEXT])
+        record_phase("images", name, "build", start, rc == 0)
+        if rc != 0:
+            print(f"❌ Could not build {tag}")
+            sys.exit(1)
+
+def snapshot_volume(database, config):
+    """Name of the snapshot volume holding `database` preloaded with the configured dataset."""
+    return f"grace-snapshot-{database}-{config.get('dataset_name', 'default')}"
+
+def volume_exists(name):
+    return docker_client().volume_exists(name)
+
+def snapshot_engine(database, config, force=False):
+    """Import PRELOAD_DATA once into a fresh `database` container whose data dir is the snapshot volume."""
+    spec = SNAPSHOT_ENGINES[database]
+    volume = snapshot_volume(database, config)
+    log_path = os.path.join(LOG_DIR, f"snapshot-{database}.log")
+    open(log_path, "w").close()
+    if volume_exists(volume):
+        if not force:
+            print(f"✅ {volume} already exists, skipping (use --force to rebuild)")
+            return {"stack": volume, "rc": 0, "seconds": 0.0, "log": log_path}
+        run_logged(["docker", "volume", "rm", volume], log_path)
+
+    start = time.monotonic()
+    started = time.time()
+    container = f"snapshot-{database}"
+    run_logged(["docker", "rm", "-f", container], log_path)
+    run_logged(["docker", "volume", "create",
+                "--label", "grace.snapshot=true",
+                "--label", f"grace.engine={database}",
+                "--label", f"grace.dataset={config.get('dataset_name', 'default')}",
+                volume], log_path)
+    cmd = ["docker", "run", "-d", "--name", container,
+           "-v", f"{volume}:{spec['data_dir']}",
+           "-v", f"{PRELOAD_DATA}:{spec['import_dir']}"]
+    for key, value in spec["env"].items():
+        cmd += ["-e", f"{key}={value}"]
+    rc = run_logged(cmd + [spec["image"]] + spec["args"], log_path)
+
+    if rc == 0:
+        deadline = time.monotonic() + SNAPSHOT_READY_TIMEOUT
+        while run_logged(["docker", "exec", container] + spec["ready"], log_path) != 0:
+            if time.monotonic() > deadline:
+                rc = 1
+                break
+            time.sleep(2)
+    if rc == 0:
+        rc = run_logged(["docker", "exec", container] + spec["load"], log_path)
+    # A clean stop matters: memgraph only writes its snapshot on shutdown.
+    run_logged(["docker", "stop", "-t", "120", container], log_path)
+    run_logged(["docker", "rm", container], log_path)
+    if rc != 0:
+        # never leave a half-imported snapshot behind for `up` to clone
+        run_logged(["docker", "volume", "rm", volume], log_path)
+
+    elapsed = time.monotonic() - start
+    record_phase(volume, container, "snapshot", started, rc == 0)
+    print(f"{'✅' if rc == 0 else '❌'} {volume} built in {elapsed:.1f}s (log: {log_path})")
+    return {"stack": volume, "rc": rc, "seconds": elapsed, "log": log_path}
+
+def snapshot_all(force=False):
+    """Build one snapshot volume per database engine used in the config, engines in parallel."""
+    config = load_config()
+    entries = config["datacenters"] if "datacenters" in config else config["dbs"]
+    engines = sorted({dc_conf["database"] for dc_conf in entries})
+    for database in engines:
+        if database not in SNAPSHOT_ENGINES:
+            print(f"⚠️ {database} has no snapshot support, it will keep importing per replica")
+    engines = [database for database in engines if database in SNAPSHOT_ENGINES]
+    os.makedirs(LOG_DIR, exist_ok=True)
+    TIMELINE.clear()
+    with ThreadPoolExecutor(max_workers=max(1, len(engines))) as executor:
+        futures = [executor.submit(snapshot_engine, database, config, force)
+                   for database in engines]
+        results = [future.result() for future in as_completed(futures)]
+    print_summary(results)
+    write_timeline(TIMELINE_FILE + "-snapshot")
+    if any(r["rc"] != 0 for r in results):
+        sys.exit(1)
+    return results
+
+def clone_labels(source):
+    """Labels of a complete clone of the current `source` volume; a rebuilt snapshot gets a new CreatedAt."""
+    info = docker_client().inspect_volume(source) or {}
+    return {"grace.clone-of": source, "grace.snapshot-created": info.get("CreatedAt", "")}
+
+def needs_clone(source, target):
+    """Whether data volume `target` is missing or not a complete clone of the current `source`."""
+    info = docker_client().inspect_volume(target)
+    return info is None or (info.get("Labels") or {}) != clone_labels(source)
+
+def clone_volume(source, target, log_path):
+    """Replace volume `target` with a copy of `source`; a failed copy leaves no volume behind."""
+    docker = docker_client()
+    try:
+        docker.remove_volume(target)
+        docker.create_volume(target, labels=clone_labels(source))
+    except DockerError as e:
+        with open(log_path, "a") as log:
+            log.write(f"{e}\n")
+        return 1
+    rc = run_logged(["docker", "run", "--rm", "-v", f"{source}:/from:ro", "-v", f"{target}:/to",
+                     SNAPSHOT_IMAGE, "cp", "-a", "/from/.", "/to/"], log_path)
+    if rc != 0:
+        try:
+            docker.remove_volume(target)
+        except DockerError:
+            pass
+    return rc
+
+def probe_tcp(port, timeout=1):
+    with socket.create_connection((READY_HOST, port), timeout=timeout):
+        return True
+
+def probe_bolt(port, timeout=1):
+    """Bolt handshake: the server answers with the agreed version once it accepts sessions."""
+    with socket.create_connection((READY_HOST, port), timeout=timeout) as sock:
+        sock.sendall(b"\x60\x60\xb0\x17" + struct.pack(">IIII", 0x0005, 0x0404, 0x0004, 0x0003))
+        version = sock.recv(4)
+        return len(version) == 4 and version != b"\x00\x00\x00\x00"
+
+def probe_http(port, path, timeout=1):
+    conn = http.client.HTTPConnection(READY_HOST, port, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        return conn.getresponse().status == 200
+    finally:
+        conn.close()
+
+def probe_mongo(port, timeout=1):
+    """Send {ping: 1} as an OP_MSG and check the reply has ok: 1."""
+    doc = b"\x10ping\x00" + struct.pack("<i", 1) + b"\x02$db\x00" + struct.pack("<i", 6) + b"admin\x00"
+    doc = struct.pack("<i", len(doc) + 5) + doc + b"\x00"
+    body = struct.pack("<I", 0) + b"\x00" + doc
+    with socket.create_connection((READY_HOST, port), timeout=timeout) as sock:
+        sock.sendall(struct.pack("<iiii", 16 + len(body), 1, 0, 2013) + body)
+        reply = sock.recv(4)
+        if len(reply) < 4:
+            return False
+        length = struct.unpack("<i", reply)[0]
+        while len(reply) < length:
+            chunk = sock.recv(length - len(reply))
+            if not chunk:
+                return False
+            reply += chunk
+    at = reply.find(b"\x01ok\x00")
+    return at >= 0 and struct.unpack("<d", reply[at + 4:at + 12])[0] == 1.0
+
+def probe(kind, port, path=None):
+    try:
+        if kind == "bolt":
+            return probe_bolt(port)
+        if kind == "http":
+            return probe_http(port, path)
+        if kind == "mongo":
+            return probe_mongo(port)
+        return probe_tcp(port)
+    except (OSError, http.client.HTTPException, struct.error):
+        return False
+
+def wait_ready(kind, port, path=None, timeout=READY_TIMEOUT):
+    """Probe with exponential backoff; returns seconds until ready, or None on timeout."""
+    start = time.monotonic()
+    delay, max_delay = READY_BACKOFF
+    while not probe(kind, port, path):
+        if time.monotonic() - start > timeout:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+    return time.monotonic() - start
+
+def run_stages(file, stages, log_path, start, stack=None):
+    """
+    Start a stack service by service: each stage's services are started without their
+    compose dependencies, then probed (or waited on, for one-shot preload containers)
+    before the next stage starts. Returns (rc, [(service, seconds since start)]).
+    Container creation and the stage's own phase are recorded in TIMELINE.
+    """
+    ready = []
+    for stage in stages:
+        name = stage["name"]
+        created = time.time()
+        rc = run_logged(["docker", "compose", "-f", file, "up", "-d", "--force-recreate", "--no-deps"]
+                        + stage["services"], log_path)
+        record_phase(stack, name, "create", created, rc == 0)
+        if rc != 0:
+            return rc, ready
+        waited = time.time()
+        rc = wait_stage(stage)
+        record_phase(stack, name, stage["phase"], waited, rc == 0)
+        if rc != 0:
+            return rc, ready
+        ready.append((name, time.monotonic() - start))
+    return 0, ready
+
+def wait_stage(stage):
+    """Wait for a started stage: its one-shot container to exit 0, or its probe to answer."""
+    name = stage["name"]
+    if stage.get("wait"):
+        try:
+            rc = docker_client().wait_container(stage["wait"])
+        except DockerError as e:
+            print(f"❌ {e}")
+            rc = 1
+        if rc != 0:
+            print(f"❌ {name} exited with {rc}")
+        return rc
+    if stage.get("probe"):
+        kind, port, path = stage["probe"]
+        if wait_ready(kind, port, path) is None:
+            print(f"❌ {name} not ready on port {port} after {READY_TIMEOUT}s")
+            return 1
+    return 0
+
+def print_readiness(results):
+    """Print time-to-ready per service, measured from the start of its stack."""
+    rows = [(r["stack"], name, seconds) for r in results for name, seconds in r.get("ready", [])]
+    if not rows:
+        return
+    width = max(len(name) for _, name, _ in rows)
+    print(f"\n{'Service':<{width}}  Ready (s)  Stack")
+    for stack, name, seconds in sorted(rows, key=lambda row: (row[0], row[2])):
+        print(f"{name:<{width}}  {seconds:>9.2f}  {stack}")
+
+def load_config():
+    with open(PATH, "r") as f:
+        return json.load(f)
+      
+@dataclass(frozen=True)
+class Replica:
+    """One replica: its database, the middleware app in front of it and where both listen."""
+    index: int  # global, 0-based
+    dc_idx: int
+    replica_idx: int
+    dc_name: str
+    database: str
+    user: str
+    password: str
+    app_log_level: str
+    website_port: int
+    protocol_port: int
+    app_port: int
+    replica_id: str
+    peer_replica_id: str
+    peer_dc_id: str
+
+    @property
+    def number(self):
+        return self.index + 1
+
+    @property
+    def stack_name(self):
+        return f"{MODE.stack_prefix}{self.number}"
+
+    @property
+    def compose_file(self):
+        return f"./Dockerfiles/docker-compose.{self.number}.yml"
+
+    @property
+    def db_name(self):
+        return f"{self.database}{self.number}"
+
+    @property
+    def preload_name(self):
+        return f"preload{self.number}"
+
+    @property
+    def app_name(self):
+        return f"app{self.number}"
+
+    @property
+    def grace_name(self):
+        return f"{MODE.app_prefix}{self.number}"
+
+    @property
+    def is_preload_leader(self):
+        return self.index == 0 and self.replica_idx == 0
+
+@dataclass
+class Topology:
+    """The deployment described by DistributionConfig.json, in either the `datacenters` or legacy `dbs` format."""
+    config: dict
+    replicas: list = field(default_factory=list)
+    provider: bool = False
+    provider_port: int = 1234
+    networks: tuple = ("Shared_net",)
+    problems: list = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config):
+        if "datacenters" in config:
+            datacenters = config["datacenters"]
+            replicas_per_dc = config.get("replicas_per_dc", 2)
+        else:
+            # Legacy format: each entry in 'dbs' is one datacenter with a single replica
+            datacenters = config["dbs"]
+            replicas_per_dc = config.get("replicas_per_dc", 1)
+        topology = cls(config, provider=bool(config.get("provider")), provider_port=config.get("provider_port", 1234))
+        dc_names = [dc_conf.get("name", f"DC{dc_idx + 1}") for dc_idx, dc_conf in enumerate(datacenters)]
+        excluded = set(config.get("excluded_replicas", []))
+
+        # (dc_idx, replica_idx, global index) of every replica, before exclusions.
+        # Replicas added with add-replica get the next free global index and join
+        # their datacenter after the regular ones.
+        members = [(dc_idx, replica_idx, dc_idx * replicas_per_dc + replica_idx)
+                   for dc_idx in range(len(datacenters)) for replica_idx in range(replicas_per_dc)]
+        extra = {}
+        for entry in config.get("extra_replicas", []):
+            if entry["dc"] not in dc_names:
+                topology.problems.append(f"extra replica {entry['number']} is in unknown datacenter {entry['dc']}")
+                continue
+            dc_idx = dc_names.index(entry["dc"])
+            replica_idx = sum(1 for m in members if m[0] == dc_idx)
+            members.append((dc_idx, replica_idx, entry["number"] - 1))
+            extra[entry["number"] - 1] = True
+
+        for dc_idx, dc_conf in enumerate(datacenters):
+            dc_name = dc_names[dc_idx]
+            # Cross-DC sync replication pairs each datacenter with the next one
+            if "datacenters" in config and len(datacenters) >= 2:
+                peer_dc_id = dc_names[(dc_idx + 1) % len(datacenters)]
+            else:
+                peer_dc_id = "none"
+            alive = [m for m in members if m[0] == dc_idx and f"{MODE.stack_prefix}{m[2] + 1}" not in excluded]
+            alive_idx = [replica_idx for _, replica_idx, _ in alive]
+            for _, replica_idx, i in alive:
+                # Peer is the next replica in the same datacenter's ring, skipping removed
+                # ones; added replicas peer with the first surviving replica instead so that
+                # the existing replicas keep their configuration.
+                if i in extra:
+                    candidates = [k for k in alive_idx if k != replica_idx]
+                elif replicas_per_dc >= 2:
+                    ring = [(replica_idx + step) % replicas_per_dc for step in range(1, replicas_per_dc)]
+                    candidates = [k for k in ring if k in alive_idx] + [k for k in alive_idx if k >= replicas_per_dc]
+                else:
+                    candidates = []
+                peer_replica_id = f"{dc_name}-replica-{candidates[0]}" if candidates else "none"
+                topology.replicas.append(Replica(
+                    index=i,
+                    dc_idx=dc_idx,
+                    replica_idx=replica_idx,
+                    dc_name=dc_name,
+                    database=dc_conf["database"],
+                    user=dc_conf["user"],
+                    password=dc_conf["password"],
+                    app_log_level=dc_conf["app_log_level"],
+                    website_port=config["base_website_port"] + i,
+                    protocol_port=config["base_protocol_port"] + i,
+                    app_port=config["base_app_port"] + i,
+                    replica_id=f"{dc_name}-replica-{replica_idx}",
+                    peer_replica_id=peer_replica_id,
+                    peer_dc_id=peer_dc_id,
+                ))
+        topology.replicas.sort(key=lambda r: r.index)
+        return topology
+
+    def validate(self):
+        """Return a list of problems that would make the deployment fail part-way."""
+        problems = list(self.problems)
+        numbers = [r.number for r in self.replicas]
+        for number in sorted({n for n in numbers if numbers.count(n) > 1}):
+            problems.append(f"replica {number} is defined more than once")
+        for r in self.replicas:
+            if r.database not in DB_PROBES:
+                problems.append(f"{r.dc_name}: unsupported database {r.database}")
+        dc_names = [dc_conf.get("name", f"DC{dc_idx + 1}")
+                    for dc_idx, dc_conf in enumerate(self.config.get("datacenters", self.config.get("dbs", [])))]
+        for name in sorted({n for n in dc_names if dc_names.count(n) > 1}):
+            problems.append(f"datacenter name {name} is used more than once")
+        for src, row in (self.config.get("wan_latency") or {}).items():
+            for dst, link in (row or {}).items():
+                if src not in dc_names or dst not in dc_names:
+                    problems.append(f"wan_latency: unknown datacenter in {src} -> {dst}")
+                elif src == dst:
+                    problems.append(f"wan_latency: {src} -> {dst} is within one datacenter and is not shaped")
+                link = {"delay_ms": link} if isinstance(link, (int, float)) else link
+                if not isinstance(link, dict) or set(link) - set(WAN_KEYS):
+                    problems.append(f"wan_latency: {src} -> {dst} must be a delay in ms or use only {', '.join(WAN_KEYS)}")
+                elif any(not isinstance(v, (int, float)) or v < 0 for v in link.values()):
+                    problems.append(f"wan_latency: {src} -> {dst} has a negative or non-numeric value")
+        if self.provider and self.config.get("provider_dc") and self.config["provider_dc"] not in dc_names:
+            problems.append(f"provider_dc: unknown datacenter {self.config['provider_dc']}")
+        problems += compute_placement(self)[1]
+        if self.provider and not MODE.provider:
+            problems.append(f"{MODE.name} deployments have no provider; set \"provider\": false")
+        owners = {}
+        if self.provider:
+            owners[self.provider_port] = "wsserver"
+        for r in self.replicas:
+            ports = [(r.protocol_port, r.db_name), (r.app_port, r.grace_name)]
+            # memgraph publishes lab on the website port, neo4j its browser
+            if r.database in ("neo4j", "memgraph"):
+                ports.append((r.website_port, r.db_name if r.database == "neo4j" else f"lab{r.number}"))
+            for port, owner in ports:
+                if port in owners:
+                    problems.append(f"port {port} is published by both {owners[port]} and {owner}")
+                owners[port] = owner
+        return problems
+
+    def stack_names(self):
+        return (["Provider"] if self.provider else []) + [r.stack_name for r in self.replicas]
+
+def load_topology():
+    topology = Topology.from_config(load_config())
+    problems = topology.validate()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    return topology
+
+def network_create(external_network_instances):
+  docker = docker_client()
+  for n in ["Shared_net"] + list(external_network_instances):
+    if docker.create_network(n, labels={"grace.deployment": "true"}):
+      print(f"✅ Created network {n}")
+    elif VERBOSE:
+      print(f"Network {n} already exists")
+
+# CPU and memory placement, from "placement" in the config, e.g.
+#   {"policy": "dedicated", "cores_per_replica": 2, "app_cores": 1, "reserved_cores": [0],
+#    "numa": true, "cpus": {"app": 1}, "mem_limit": {"db": "4g", "app": "1g", "preload": "2g"}}
+# "dedicated" gives each replica its own cores on one NUMA node, shared by its database,
+# preload and lab containers; app_cores of them go to the GRACE app alone. Reserved cores
+# are left to the host and the provider. "shared" only applies the cpus/mem_limit caps.
+# Roles for cpus/mem_limit: db, lab, preload, app, provider.
+PLACEMENT_POLICIES = ("none", "shared", "dedicated")
+PLACEMENT_FILE = os.path.join(LOG_DIR, "placement.json")
+PLACEMENT = {}  # container name -> {"role", "cpuset", "cpus", "mem_limit", "numa_node"}
+
+def parse_cpulist(text):
+    """'0-3,8' -> [0, 1, 2, 3, 8]"""
+    cpus = []
+    for part in text.strip().split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def numa_nodes():
+    """{node: [cpu, ...]} of this host; one node with every CPU where sysfs has no NUMA info."""
+    nodes = {}
+    for path in sorted(glob.glob("/sys/devices/system/node/node*/cpulist")):
+        node = int(re.search(r"node(\d+)", path).group(1))
+        with open(path) as f:
+            cpus = parse_cpulist(f.read())
+        if cpus:
+            nodes[node] = cpus
+    return nodes or {0: list(range(os.cpu_count() or 1))}
+
+def compute_placement(topology, nodes=None):
+    """Resources of every container for the config's placement policy: returns (placement, problems)."""
+    policy = topology.config.get("placement") or {}
+    name = policy.get("policy", "none")
+    if name not in PLACEMENT_POLICIES:
+        return {}, [f"placement: unknown policy {name} (use one of {', '.join(PLACEMENT_POLICIES)})"]
+    if name == "none":
+        return {}, []
+    nodes = nodes or numa_nodes()
+    caps = lambda role: {key: policy[key][role] for key in ("cpus", "mem_limit") if role in (policy.get(key) or {})}
+
+    containers = {}
+    for r in topology.replicas:
+        containers[r.db_name] = ("db", r)
+        if r.database == "memgraph":
+            containers[f"lab{r.number}"] = ("lab", r)
+        containers[r.preload_name] = ("preload", r)
+        containers[r.grace_name] = ("app", r)
+    placement = {container: dict(role=role, **caps(role)) for container, (role, _) in containers.items()}
+    if topology.provider:
+        placement["wsserver"] = dict(role="provider", **caps("provider"))
+    if name == "shared":
+        return placement, []
+
+    cores = policy.get("cores_per_replica", 1)
+    app_cores = policy.get("app_cores", 0)
+    if app_cores >= cores:
+        return {}, [f"placement: app_cores ({app_cores}) must leave the database at least one of {cores} cores_per_replica"]
+    reserved = set(policy.get("reserved_cores", []))
+    free = {node: [cpu for cpu in cpus if cpu not in reserved] for node, cpus in nodes.items()}
+    if not policy.get("numa", True):
+        free = {0: [cpu for node in sorted(free) for cpu in free[node]]}
+    assigned = {}
+    for r in topology.replicas:
+        # the node with the most free cores keeps replicas spread evenly across nodes
+        node = max(free, key=lambda n: (len(free[n]), -n))
+        if len(free[node]) < cores:
+            total = sum(len(cpus) for cpus in nodes.values()) - len(reserved)
+            return {}, [f"placement: {len(topology.replicas)} replicas x {cores} cores do not fit in "
+                        f"{total} unreserved cores" + (" within NUMA nodes" if policy.get("numa", True) else "")]
+        assigned[r.number], free[node] = (node, free[node][:cores]), free[node][cores:]
+    for container, (role, r) in containers.items():
+        node, cpus = assigned[r.number]
+        if app_cores:
+            cpus = cpus[cores - app_cores:] if role == "app" else cpus[:cores - app_cores]
+        placement[container].update(cpuset=",".join(map(str, cpus)), numa_node=node if policy.get("numa", True) else None)
+    if topology.provider and reserved:
+        placement["wsserver"]["cpuset"] = ",".join(map(str, sorted(reserved)))
+    return placement, []
+
+def write_if_changed(path, content):
+    """Write `content` to `path` unless the file already holds exactly that; returns whether it wrote."""
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, "w") as f:
+        f.write(content)
+    return True
+
+def with_resources(content):
+    """Add cpuset/cpus/mem_limit from PLACEMENT to every service, right after its container_name."""
+    lines = []
+    for line in content.split("\n"):
+        lines.append(line)
+        match = re.match(r"^(\s+)container_name: (\S+)$", line)
+        resources = PLACEMENT.get(match.group(2)) if match else None
+        if not resources:
+            continue
+        pad = match.group(1)
+        if resources.get("cpuset"):
+            lines.append(f'{pad}cpuset: "{resources["cpuset"]}"')
+        if resources.get("cpus"):
+            lines.append(f"{pad}cpus: {resources['cpus']}")
+        if resources.get("mem_limit"):
+            lines.append(f'{pad}mem_limit: "{resources["mem_limit"]}"')
+    return "\n".join(lines)
+
+def write_placement(topology):
+    """Compute the placement for `topology` and record it in PLACEMENT_FILE."""
+    placement, _ = compute_placement(topology)
+    PLACEMENT.clear()
+    PLACEMENT.update(placement)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    write_if_changed(PLACEMENT_FILE, json.dumps({"policy": topology.config.get("placement") or {"policy": "none"},
+                                                 "numa_nodes": numa_nodes(), "containers": placement}, indent=2))
+
+def with_spec_label(content, service):
+    """
+    Label `service` with a hash of the whole stack definition so `up` can tell
+    whether a running stack still matches what would be generated now.
+    Returns (labelled content, spec).
+    """
+    spec = hashlib.sha256(content.encode()).hexdigest()[:12]
+    return content.replace(service, f"{service}    labels:\n      grace.spec: \"{spec}\"\n", 1), spec
+
+def write_compose(path, content, stack_name, spec):
+    """Write a generated compose file if it changed and remember its stack identity for plan_stacks."""
+    GENERATED[path] = (stack_name, spec)
+    if write_if_changed(path, content):
+        print(f"Generated {path}")
+
+def generate_provider(config, external_network_instances):
+    port = config["provider_port"]
+
+    # Create external networks (your helper)
+    network_create(external_network_instances)
+
+    # Build YAML explicitly to avoid indentation issues
+    STACK_STAGES["Provider"] = [{"name": "wsserver", "services": ["wsserver"], "phase": "ready", "probe": ("tcp", port, None)}]
+
+    lines = [
+        "name: Provider",
+        "services:",
+        "  wsserver:",
+        "    container_name: wsserver",
+        f"    image: {IMAGE_TAGS['grace-wsserver']}",
+        "    ports:",
+        f'      - "{port}:1234"',
+        "    environment:",
+        f'      PORT: "{port}"',
+        '      HOST: "0.0.0.0"',
+        "    cap_add:",
+        "       - NET_ADMIN",
+        "    networks:",
+        "      - Shared_net"
+    ]
+    # attach to each external Grace network
+    for n in external_network_instances:
+        lines.append(f"      - {n}")
+
+    # networks section
+    lines += [
+        "",
+        "networks:",
+        "  Shared_net:",
+        "     external: true"
+    ]
+    for n in external_network_instances:
+        lines += [
+            f"  {n}:",
+            "    external: true",
+        ]
+
+    content, spec = with_spec_label(with_resources("\n".join(lines) + "\n"), "  wsserver:\n")
+
+    filename = "docker-compose.provider.yml"
+    filepath = f"./Dockerfiles/{filename}"
+    write_compose(filepath, content, "Provider", spec)
+    return filepath
+  
+  
+def database_service(database, i, db_name, preloadName, website_port, protocol_port, password, data_volume=None):
+    """
+    Compose services for one replica's database.
+    Returns (db_url, database block, preload block); the preload block is empty when the
+    engine has no preload step or when data_volume restores a snapshot instead.
+    """
+    data_dir = SNAPSHOT_ENGINES.get(database, {}).get("data_dir")
+    data_mount = f"- {data_volume}:{data_dir}" if data_volume else ""
+    preload_block = ""
+
+    if database == "neo4j":
+        db_url = f"bolt://{db_name}:7687"
+        databaseService = dedent(f"""
+        {db_name}:
+          image: neo4j:4.4.24
+          container_name: {db_name}
+          ports:
+            - "{website_port}:7474"
+            - "{protocol_port}:7687"
+          environment:
+            NEO4J_AUTH: none
+            NEO4JLABS_PLUGINS: '["apoc"]'
+            NEO4J_apoc_import_file_enabled: "true"
+            NEO4J_apoc_import_file_use__neo4j__config: "true"
+            NEO4J_dbms_security_procedures_unrestricted: "apoc.*"
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/neo4j/import
+            {data_mount}
+          ulimits:
+            nofile:
+              soft: 40000
+              hard: 40000
+          
+          healthcheck:
+            test: [ "CMD", "bash", "-c", "cypher-shell -u neo4j -p {password} 'RETURN 1'" ]
+            interval: 10s
+            timeout: 5s
+            retries: 10
+          networks:
+            - Shared_net
+        """).strip("\n")
+        preload_block = dedent(f"""
+        {preloadName}:
+          image: neo4j:4.4.24
+          container_name: preload{i+1}
+          depends_on:
+            {db_name}:
+              condition: service_healthy
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/neo4j/import
+          entrypoint:
+            [
+              "bash", "-c",
+              "cypher-shell -a bolt://{db_name}:7687 -u pandey -p verysecretpassword -f /var/lib/neo4j/import/preloadNeo4j.cypher"
+            ]
+          networks:
+            - Shared_net
+        """).strip("\n")
+    elif database == "memgraph":  # memgraph
+        db_url = f"bolt://{db_name}:7687"
+        # snapshot restores need memgraph to recover its on-disk snapshot at startup
+        recovery = ', "--data-recovery-on-startup=true"' if data_volume else ""
+        databaseService = dedent(f"""
+        {db_name}:
+          image: memgraph/memgraph:latest
+          container_name: {db_name}
+          command: ["--log-level=TRACE"{recovery}]
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/memgraph/import
+            {data_mount}
+          healthcheck:
+            test: ["CMD-SHELL", "echo 'RETURN 0;' | mgconsole || exit 1"]
+            interval: 10s
+            timeout: 5s
+            retries: 3
+            start_period: 0s
+          ports:
+            - "{protocol_port}:7687"
+          networks:
+            - Shared_net
+        lab{i+1}:
+          image: memgraph/lab
+          container_name: lab{i+1}
+          depends_on:
+            {db_name}:
+              condition: service_healthy
+          ports:
+            - "{website_port}:3000"
+          environment:
+            QUICK_CONNECT_MG_HOST: {db_name}
+            QUICK_CONNECT_MG_PORT: 7687
+          networks:
+            - Shared_net
+        """).strip("\n")
+        preload_block = dedent(f"""
+        {preloadName}:
+          image: memgraph/memgraph:latest
+          container_name: preload{i+1}
+          depends_on:
+            {db_name}:
+              condition: service_healthy
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/memgraph/import
+          entrypoint:
+            [
+              "bash", "-c",
+              "cat  /var/lib/memgraph/import/preloadMemgraph.cypher | mgconsole --host {db_name} --port 7687"
+            ]
+          networks:
+            - Shared_net
+        """).strip("\n")
+    elif database == "janusgraph":  # janusgraph
+        db_url = f"ws://{db_name}:8182"
+        databaseService = dedent(f"""
+        {db_name}:
+          image: docker.io/janusgraph/janusgraph:latest
+          container_name: {db_name}
+          healthcheck:
+            test: ["CMD-SHELL", "bin/gremlin.sh", "-e", "scripts/remote-connect.groovy"]
+            interval: 25s
+            timeout: 20s
+            retries: 3
+          ports:
+            - "{protocol_port}:8182"
+          networks:
+            - Shared_net
+        """).strip("\n")
+
+    elif database == "arangodb":  # arangodb
+        db_url = f"http://{db_name}:8529"
+        databaseService = dedent(f"""
+        {db_name}:
+          image: arangodb:latest
+          container_name: {db_name}
+          environment:
+            ARANGO_NO_AUTH : 1
+          healthcheck:
+            test: ["CMD-SHELL", "arangosh --server.endpoint tcp://127.0.0.1:8529 --server.authentication false --javascript.execute-string 'quit(0)'"]
+            interval: 5s
+            timeout: 5s
+            retries: 5
+          ports:
+            - "{protocol_port}:8529"
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/arangodb/import
+            {data_mount}
+          networks:
+            - Shared_net
+        """).strip("\n")
+        preload_block = dedent(f"""
+        {preloadName}:
+          image: arangodb:latest
+          container_name: {preloadName}
+          depends_on:
+            {db_name}:
+              condition: service_healthy
+          volumes:
+            - ../../PreloadData:/var/lib/arangodb/import
+          entrypoint:
+            [
+              "sh", "/var/lib/arangodb/import/arangoDBImport.sh", "tcp://{db_name}:8529" , "1"
+            ]
+          networks:
+            - Shared_net
+        """).strip("\n")
+    elif database == "mongodb":  # mongodb
+        db_url = f"mongodb://{db_name}:27017"
+        databaseService = dedent(f"""
+        {db_name}:
+          image: mongo:8.0.14-rc0
+          container_name: {db_name}
+          ports:
+            - "{protocol_port}:27017"
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/mongodb/import
+            {data_mount}
+          healthcheck:
+            test: echo 'db.runCommand("ping").ok' | mongosh mongodb://{db_name}:27017/ --quiet
+            interval: 10s
+            timeout: 5s
+            retries: 5
+          networks:
+              - Shared_net
+        """).strip("\n")
+        preload_block = dedent(f"""
+        {preloadName}:
+          image: mongo:8.0.14-rc0
+          container_name: preload{i+1}
+          depends_on:
+            {db_name}:
+              condition: service_healthy
+          volumes:
+            - {PRELOAD_DATA}:/var/lib/mongodb/import
+          entrypoint: 
+            ["/var/lib/mongodb/import/mongoDBImport.sh", "{db_name}:27017"]
+          networks:
+            - Shared_net
+        """).strip("\n")
+    # elif database == "nebulagraph":  # nebulagraph
+    #     db_url = f"http://{db_name}:7687"
+    #     databaseService = dedent(f"""
+    #     {db_name}:
+    #       image: vesoft/nebula-graphd:latest
+    #       container_name: {db_name}
+    #       environment:
+    #         TZ: "UTC"
+    #       healthcheck:
+    #         test: ["CMD-SHELL", "echo 'SHOW HOSTS;' | nebula-console -u root -p nebula --address {db_name} --port 3699 || exit 1"]
+    #         interval: 10s
+    #         timeout: 5s
+    #         retries: 5
+    #       ports:
+    #         - "{protocol_port}:3699"
+    #       networks:
+    #         - Shared_net
+    #     """).strip("\n")  
+    else:
+        print(f"Unsupported database: {database}")
+        sys.exit(1)
+
+    # drop the empty data mount line left when no snapshot volume is used
+    databaseService = "\n".join(line for line in databaseService.split("\n") if line.strip())
+    if data_volume:
+        preload_block = ""
+    return db_url, databaseService, preload_block
+
+def generate_compose_file(replica, config):
+    """Generate the compose file for one replica of the topology."""
+    i = replica.index
+    database = replica.database
+    db_name = replica.db_name
+    preloadName = replica.preload_name
+    app_name = replica.app_name
+    grace_name = replica.grace_name
+    stack_name = replica.stack_name
+
+    # With preload_snapshot the database starts from a copy of the dataset snapshot
+    # volume (see `snapshot`) instead of importing the CSVs itself.
+    data_volume = None
+    if config.get("preload_snapshot") and database in SNAPSHOT_ENGINES:
+        data_volume = f"grace-data-{db_name}"
+        STACK_VOLUMES[stack_name] = (snapshot_volume(database, config), data_volume)
+    else:
+        STACK_VOLUMES.pop(stack_name, None)
+
+    db_url, databaseService, preload_block = database_service(
+        database, i, db_name, preloadName, replica.website_port, replica.protocol_port, replica.password, data_volume)
+
+    kind, path = DB_PROBES[database]
+    stages = [{"name": db_name, "services": [db_name] + ([f"lab{i+1}"] if database == "memgraph" else []),
+               "phase": "healthy", "probe": (kind, replica.protocol_port, path)}]
+    if preload_block:
+        stages.append({"name": preloadName, "services": [preloadName], "phase": "preload", "wait": f"preload{i+1}"})
+    stages.append({"name": grace_name, "services": [app_name], "phase": "ready",
+                   "probe": ("http", replica.app_port, MODE.ready_path)})
+    STACK_STAGES[stack_name] = stages
+        
+    # indent to exact nesting levels
+    databaseService_block = indent(databaseService, "  ")  # under `services:`
+    environment_block = indent(MODE.app_environment(replica, config, db_url), "      ")    # under `environment:`
+
+    lines = [
+        f"name: {stack_name}",
+        "services:",
+        databaseService_block,
+    ]
+    if preload_block:
+        lines.append(indent(preload_block, "  "))
+    lines += [
+        "",
+        f"  {app_name}:",
+        f"    image: {IMAGE_TAGS[MODE.app_image]}",
+        f"    container_name: {grace_name}",
+        "    ports:",
+        f'      - "{replica.app_port}:3000"',
+        "    environment:",
+        environment_block,
+        "    cap_add:",
+        "       - NET_ADMIN",
+        "    depends_on:",
+        f"      {db_name}:",
+        "        condition: service_healthy",
+    ]
+    if preload_block:
+        lines += [
+            f"      {preloadName}:",
+            "         condition: service_completed_successfully",
+        ]
+    lines.append("    networks:")
+    lines += [f"      - {network}" for network in MODE.app_networks(replica)]
+    volumes = MODE.app_volumes(replica, PRELOAD_DATA)
+    if volumes:
+        lines.append("    volumes:")
+        lines += [f"      - {volume}" for volume in volumes]
+    lines.append("networks:")
+    lines += [f"  {network}:" for network in MODE.app_networks(replica) if network != "Shared_net"]
+    lines += [
+        f"  Shared_net:",
+        f"    external: true",
+    ]
+    if data_volume:
+        lines += [
+            "volumes:",
+            f"  {data_volume}:",
+            "    external: true",
+        ]
+
+    content, spec = with_spec_label(with_resources("\n".join(lines) + "\n"), f"  {app_name}:\n")
+    filename = replica.compose_file
+    write_compose(filename, content, stack_name, spec)
+    return filename
+  
+  
+def generate_all(topology=None):
+    topology = topology or load_topology()
+    config = topology.config
+    for name, dockerfile in MODE.images.items():
+        IMAGE_TAGS[name] = image_tag(name, dockerfile)
+    write_placement(topology)
+    GENERATED.clear()
+    files = []
+    external_network_instances = []
+    
+    if topology.provider:
+      provider = generate_provider(config, external_network_instances)
+      files.append(provider) 
+    
+    for replica in topology.replicas:
+        files.append(generate_compose_file(replica, config))
+    
+    return files
+
+def bring_up_stack(file, stack_name):
+    """Start one compose stack, capturing its output in Logs/<stack>.log."""
+    log_path = os.path.join(LOG_DIR, f"{stack_name}.log")
+    open(log_path, "w").close()
+    start = time.monotonic()
+    rc = 0
+    if stack_name in STACK_VOLUMES and needs_clone(*STACK_VOLUMES[stack_name]):
+        # a recreated stack's database still mounts the old volume, which cannot be removed while in use
+        rc = run_logged(["docker", "compose", "-p", stack_name, "down"], log_path)
+        if rc == 0:
+            cloned = time.time()
+            rc = clone_volume(*STACK_VOLUMES[stack_name], log_path)
+            record_phase(stack_name, STACK_VOLUMES[stack_name][1], "clone", cloned, rc == 0)
+    ready = []
+    if rc == 0 and (COMPOSE_WAIT or stack_name not in STACK_STAGES):
+        started = time.time()
+        rc = run_logged(["docker","compose", "-f", file, "up", "-d", "--force-recreate"], log_path)
+        record_phase(stack_name, stack_name, "up", started, rc == 0)
+    elif rc == 0:
+        rc, ready = run_stages(file, STACK_STAGES[stack_name], log_path, start, stack_name)
+    elapsed = time.monotonic() - start
+    print(f"{'✅' if rc == 0 else '❌'} {stack_name} {'up' if COMPOSE_WAIT else 'ready'} in {elapsed:.1f}s (log: {log_path})")
+    return {"stack": stack_name, "rc": rc, "seconds": elapsed, "log": log_path, "ready": ready}
+
+def print_summary(results):
+    """Print time-to-up per stack, slowest first."""
+    if not results:
+        return
+    width = max(len(r["stack"]) for r in results)
+    print(f"\n{'Stack':<{width}}  Status  Up (s)  Log")
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        status = "ok" if r["rc"] == 0 else f"rc={r['rc']}"
+        print(f"{r['stack']:<{width}}  {status:<6}  {r['seconds']:>6.1f}  {r['log']}")
+
+def stack_name_re():
+    """Compose project names of this deployment's stacks."""
+    return re.compile(rf"^({MODE.stack_prefix}\d+|Provider)$")
+
+def running_stacks():
+    """
+    Map each deployed GRACE compose project to (spec label, whether its spec-labelled
+    service is running), from a single container listing.
+    """
+    stacks = {}
+    for container in docker_client().containers(filters={"label": ["com.docker.compose.project"]}):
+        labels = container.get("Labels") or {}
+        project = labels.get("com.docker.compose.project", "")
+        if not stack_name_re().match(project):
+            continue
+        stacks.setdefault(project, (None, False))
+        if labels.get("grace.spec"):
+            stacks[project] = (labels["grace.spec"], container.get("State") == "running")
+    return stacks
+
+def stack_identity(compose_file):
+    """The project name and grace.spec label of a generated compose file, from one parse."""
+    with open(compose_file) as f:
+        data = yaml.safe_load(f) or {}
+    for service in (data.get("services") or {}).values():
+        spec = (service.get("labels") or {}).get("grace.spec")
+        if spec:
+            return data.get("name"), spec
+    return data.get("name"), None
+
+def plan_stacks(files):
+    """Diff generated stacks against running ones: returns {stack: action} and the file of each stack."""
+    running = running_stacks()
+    plan, stack_files = {}, {}
+    for file in files:
+        stack_name, spec = GENERATED.get(file) or stack_identity(file)
+        if not stack_name:
+            print(f"⚠️ No 'name' found in {file}, skipping")
+            continue
+        stack_files[stack_name] = file
+        if stack_name not in running:
+            plan[stack_name] = "start"
+        elif running[stack_name] != (spec, True):
+            plan[stack_name] = "recreate"
+        else:
+            plan[stack_name] = "keep"
+    for stack_name in running:
+        if stack_name not in stack_files:
+            plan[stack_name] = "stop"
+    return plan, stack_files
+
+def up_all(topology=None):
+    topology = topology or load_topology()
+    TIMELINE.clear()
+    files = generate_all(topology)
+    existing_files = [
+      (os.path.join("./Dockerfiles", f))
+      for f in os.listdir("./Dockerfiles")
+      if os.path.isfile(os.path.join("./Dockerfiles", f)) and f.lower().endswith(('.yaml', '.yml'))
+    ]
+
+    plan, stack_files = plan_stacks(files)
+    labels = {
+        "keep": " ✅ Running, unchanged",
+        "start": "⚠️ Not running, will start",
+        "recreate": "🔄 Changed or not running, will recreate",
+        "stop": "🛑 No longer in the topology, will stop",
+    }
+    for stack_name, action in plan.items():
+        print(f"{stack_name}: {labels[action]}")
+
+    # Stop removed stacks first so their ports are free for the rest.
+    for stack_name in [s for s, action in plan.items() if action == "stop"]:
+        run_command(["docker", "compose", "-p", stack_name, "down"])
+    for file in existing_files:
+      if file not in files:
+          print(f"Deleting {file} ...")
+          os.remove(file)
+
+    ensure_images()
+    missing = [snap for snap in sorted({snap for snap, _ in STACK_VOLUMES.values()}) if not volume_exists(snap)]
+    if missing:
+        print(f"❌ Missing snapshot volumes {', '.join(missing)}; run `Deployment.py snapshot` first")
+        sys.exit(1)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    provider = []
+    replicas = []
+    for stack_name, action in plan.items():
+      if action in ("start", "recreate"):
+          (provider if stack_name == "Provider" else replicas).append((stack_files[stack_name], stack_name))
+
+    # The provider must be up before any replica connects to it; replicas are independent.
+    results = [bring_up_stack(file, stack_name) for file, stack_name in provider]
+    with ThreadPoolExecutor(max_workers=PARALLEL) as executor:
+      futures = [executor.submit(bring_up_stack, file, stack_name) for file, stack_name in replicas]
+      results += [future.result() for future in as_completed(futures)]
+    print_summary(results)
+    print_readiness(results)
+    # Recreated containers lose their rules and peers may have new addresses, so reapply everywhere;
+    # with every stack kept, only a changed matrix needs applying.
+    wan = topology.config.get("wan_latency")
+    if wan and all(r["rc"] == 0 for r in results) and (results or applied_wan() != wan_settings(topology)):
+        apply_wan(topology)
+    write_timeline()
+    return results
+
+# Inter-datacenter links, from "wan_latency" in the config: {src DC: {dst DC: link}}, where a
+# link is a one-way delay in ms or {"delay_ms", "jitter_ms", "rate_mbit", "loss_pct"}. A
+# direction without an entry uses the reverse one. Shaping is applied on each app
+# container's Shared_net interface, grouped into one netem band per remote datacenter.
+# With a provider, GRACE replicas exchange updates only through wsserver, which sits in
+# "provider_dc" (default: the first datacenter): a replica's egress to the provider gets
+# the link from its datacenter to the provider's, and wsserver's egress one band per
+# remote datacenter, so an update from A reaches B after link(A, P) + link(P, B).
+WAN_KEYS = ("delay_ms", "jitter_ms", "rate_mbit", "loss_pct")
+WAN_TOLERANCE_MS = 5  # allowed RTT error on top of the links' jitter
+WAN_PINGS = 10
+WAN_FILE = os.path.join(LOG_DIR, "wan.json")  # the wan_latency last applied and verified
+
+def applied_wan():
+    try:
+        with open(WAN_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def wan_settings(topology):
+    """What apply_wan installs, as saved in WAN_FILE once verified."""
+    settings = {"wan_latency": topology.config.get("wan_latency")}
+    if topology.provider:
+        settings["provider_dc"] = provider_dc(topology.config)
+    return settings
+
+def provider_dc(config):
+    """Datacenter the provider is placed in: "provider_dc", else the first datacenter."""
+    datacenters = config.get("datacenters", config.get("dbs", []))
+    return config.get("provider_dc") or (datacenters[0].get("name", "DC1") if datacenters else None)
+
+def wan_link(config, src, dst):
+    """netem parameters for traffic from datacenter `src` to `dst`, or None if unshaped."""
+    matrix = config.get("wan_latency") or {}
+    link = (matrix.get(src) or {}).get(dst)
+    if link is None:
+        link = (matrix.get(dst) or {}).get(src)
+    if isinstance(link, (int, float)):
+        link = {"delay_ms": link}
+    return link
+
+def netem_args(link):
+    args = ["delay", f"{link.get('delay_ms', 0)}ms"]
+    if link.get("jitter_ms"):
+        args += [f"{link['jitter_ms']}ms", "distribution", "normal"]
+    if link.get("loss_pct"):
+        args += ["loss", f"{link['loss_pct']}%"]
+    if link.get("rate_mbit"):
+        args += ["rate", f"{link['rate_mbit']}mbit"]
+    return " ".join(args)
+
+def combine_links(a, b):
+    """netem parameters for traffic that passes both links: delays and jitters add, losses compound."""
+    combined = {"delay_ms": a.get("delay_ms", 0) + b.get("delay_ms", 0)}
+    if a.get("jitter_ms") or b.get("jitter_ms"):
+        combined["jitter_ms"] = a.get("jitter_ms", 0) + b.get("jitter_ms", 0)
+    if a.get("loss_pct") or b.get("loss_pct"):
+        combined["loss_pct"] = round(100 - (100 - a.get("loss_pct", 0)) * (100 - b.get("loss_pct", 0)) / 100, 3)
+    rates = [link["rate_mbit"] for link in (a, b) if link.get("rate_mbit")]
+    if rates:
+        combined["rate_mbit"] = min(rates)
+    return combined
+
+def wan_groups(replica, topology, addresses):
+    """(datacenter, link, peer addresses) of every shaped remote datacenter of `replica`, and of the provider."""
+    groups = []
+    for dc in sorted({r.dc_name for r in topology.replicas} - {replica.dc_name}):
+        link = wan_link(topology.config, replica.dc_name, dc)
+        if link:
+            peers = [addresses[r.grace_name] for r in topology.replicas if r.dc_name == dc]
+            groups.append((dc, link, peers))
+    if topology.provider and replica.dc_name != provider_dc(topology.config):
+        link = wan_link(topology.config, replica.dc_name, provider_dc(topology.config))
+        if link:
+            groups.append(("provider", link, [addresses["wsserver"]]))
+    return groups
+
+def provider_groups(topology, addresses):
+    """(datacenter, link, replica addresses) of every datacenter shaped on wsserver's egress."""
+    home = provider_dc(topology.config)
+    groups = []
+    for dc in sorted({r.dc_name for r in topology.replicas} - {home}):
+        link = wan_link(topology.config, home, dc)
+        if link:
+            groups.append((dc, link, [addresses[r.grace_name] for r in topology.replicas if r.dc_name == dc]))
+    return groups
+
+def shaping_script(ip, groups, fault=None):
+    """
+    Shell script that (re)installs the egress shaping of the interface holding `ip`: a
+    prio root qdisc with one extra band per group, a netem qdisc on each of those bands,
+    and u32 filters steering every peer address of a group into its band. A `fault`
+    link (see faults.py) is added on top of every band, the default ones included.
+    """
+    lines = [
+        "set -e",
+        f"DEV=$(ip -o -4 addr show | awk '{{split($4, a, \"/\"); if (a[1] == \"{ip}\") print $2}}')",
+        "tc qdisc del dev $DEV root 2>/dev/null || true",
+    ]
+    if groups or fault:
+        lines.append(f"tc qdisc add dev $DEV root handle 1: prio bands {3 + len(groups)}")
+    if fault:
+        for band in (1, 2, 3):
+            lines.append(f"tc qdisc add dev $DEV parent 1:{band} handle {band}0: netem {netem_args(fault)}")
+    for j, (name, link, peers) in enumerate(groups):
+        band = 4 + j
+        link = combine_links(link, fault) if fault else link
+        lines.append(f"tc qdisc add dev $DEV parent 1:{band} handle {band}0: netem {netem_args(link)}")
+        for peer in peers:
+            lines.append(f"tc filter add dev $DEV protocol ip parent 1:0 prio {band} u32 match ip dst {peer}/32 flowid 1:{band}")
+    return "\n".join(lines) + "\n"
+
+def wan_script(replica, topology, addresses, fault=None):
+    """
+    Shell script that (re)installs `replica`'s WAN shaping: one netem band per shaped
+    remote datacenter. Traffic to the provider and within the datacenter stays on the
+    default bands, which only a `fault` shapes.
+    """
+    return shaping_script(addresses[replica.grace_name], wan_groups(replica, topology, addresses), fault)
+
+def provider_script(topology, addresses, fault=None):
+    """Shell script that (re)installs wsserver's WAN shaping: one netem band per remote datacenter."""
+    return shaping_script(addresses["wsserver"], provider_groups(topology, addresses), fault)
+
+def shared_addresses(topology):
+    """Shared_net address of every app container and the provider, or None if one is not running."""
+    addresses = {}
+    for name in [r.grace_name for r in topology.replicas] + (["wsserver"] if topology.provider else []):
+        info = docker_client().inspect_container(name)
+        network = ((info or {}).get("NetworkSettings", {}).get("Networks") or {}).get("Shared_net")
+        if not network or not network.get("IPAddress"):
+            print(f"❌ {name} is not running on Shared_net")
+            return None
+        addresses[name] = network["IPAddress"]
+    return addresses
+
+def measure_rtt(container, address, count=WAN_PINGS):
+    """Average ping RTT in ms from `container` to `address`, or None if ping failed."""
+    result = subprocess.run(["docker", "exec", container, "ping", "-q", "-c", str(count), "-i", "0.2", address],
+                            capture_output=True, text=True)
+    match = re.search(r"= [\d.]+/([\d.]+)/", result.stdout)
+    return float(match.group(1)) if match else None
+
+def apply_wan(topology):
+    """Install the configured WAN shaping on every app container and the provider in parallel, then verify it by RTT."""
+    if not topology.config.get("wan_latency"):
+        return True
+    addresses = shared_addresses(topology)
+    if addresses is None:
+        return False
+    os.makedirs(LOG_DIR, exist_ok=True)
+    start = time.monotonic()
+
+    def install(target):
+        stack, name, script = target
+        log_path = os.path.join(LOG_DIR, f"wan-{name}.log")
+        open(log_path, "w").close()
+        shaped = time.time()
+        rc = run_logged(["docker", "exec", name, "sh", "-c", script], log_path)
+        record_phase(stack, name, "wan", shaped, rc == 0)
+        return name, rc
+
+    targets = [(r.stack_name, r.grace_name, wan_script(r, topology, addresses)) for r in topology.replicas]
+    if topology.provider:
+        targets.append(("Provider", "wsserver", provider_script(topology, addresses)))
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        failed = [name for name, rc in executor.map(install, targets) if rc != 0]
+    if failed:
+        print(f"❌ Could not shape {', '.join(failed)} (see {LOG_DIR}/wan-<container>.log)")
+        return False
+    print(f"✅ WAN shaping applied to {len(targets)} containers in {time.monotonic() - start:.1f}s")
+    ok = verify_wan(topology, addresses)
+    if ok:
+        with open(WAN_FILE, "w") as f:
+            json.dump(wan_settings(topology), f, indent=2)
+    return ok
+
+def verify_wan(topology, addresses):
+    """
+    Ping between one replica of every pair of datacenters and compare with the configured
+    RTT. With a provider, updates are relayed by wsserver, so each datacenter's RTT to the
+    provider is measured instead and a pair's RTT is the sum of its two legs.
+    """
+    first = {}
+    for r in topology.replicas:
+        first.setdefault(r.dc_name, r)
+    if topology.provider:
+        return verify_relayed_wan(topology, addresses, first)
+    pairs = []
+    for src, dst in itertools.combinations(sorted(first), 2):
+        links = [wan_link(topology.config, src, dst) or {}, wan_link(topology.config, dst, src) or {}]
+        expected = sum(link.get("delay_ms", 0) for link in links)
+        tolerance = WAN_TOLERANCE_MS + sum(link.get("jitter_ms", 0) for link in links)
+        pairs.append((src, dst, expected, tolerance))
+    with ThreadPoolExecutor(max_workers=max(1, len(pairs))) as executor:
+        measured = list(executor.map(
+            lambda pair: measure_rtt(first[pair[0]].grace_name, addresses[first[pair[1]].grace_name]), pairs))
+    ok = True
+    print(f"{'Link':<16}  {'expected':>9}  {'measured':>9}")
+    for (src, dst, expected, tolerance), rtt in zip(pairs, measured):
+        good = rtt is not None and abs(rtt - expected) <= tolerance
+        ok &= good
+        shown = f"{rtt:9.1f}" if rtt is not None else f"{'-':>9}"
+        print(f"{src + ' <-> ' + dst:<16}  {expected:9.1f}  {shown}  {'✅' if good else '❌'}")
+    return ok
+
+def verify_relayed_wan(topology, addresses, first):
+    """Ping wsserver from one replica of every datacenter; report each leg and each pair through the provider."""
+    home = provider_dc(topology.config)
+    legs = {}
+    for dc in sorted(first):
+        links = [wan_link(topology.config, dc, home) or {}, wan_link(topology.config, home, dc) or {}]
+        legs[dc] = (sum(link.get("delay_ms", 0) for link in links),
+                    WAN_TOLERANCE_MS + sum(link.get("jitter_ms", 0) for link in links))
+    with ThreadPoolExecutor(max_workers=len(legs)) as executor:
+        measured = dict(zip(legs, executor.map(
+            lambda dc: measure_rtt(first[dc].grace_name, addresses["wsserver"]), legs)))
+    rows = [(f"{dc} <-> provider", legs[dc][0], legs[dc][1], measured[dc]) for dc in legs]
+    for src, dst in itertools.combinations(sorted(legs), 2):
+        rtt = measured[src] + measured[dst] if measured[src] is not None and measured[dst] is not None else None
+        rows.append((f"{src} <-> {dst}", legs[src][0] + legs[dst][0],
+                     legs[src][1] + legs[dst][1] - WAN_TOLERANCE_MS, rtt))
+    ok = True
+    print(f"Provider in {home}; pairs are relayed by wsserver")
+    print(f"{'Link':<20}  {'expected':>9}  {'measured':>9}")
+    for label, expected, tolerance, rtt in rows:
+        good = rtt is not None and abs(rtt - expected) <= tolerance
+        ok &= good
+        shown = f"{rtt:9.1f}" if rtt is not None else f"{'-':>9}"
+        print(f"{label:<20}  {expected:9.1f}  {shown}  {'✅' if good else '❌'}")
+    return ok
+
+def save_config(config):
+    with open(PATH, "w") as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+
+def graph_counts(port):
+    """(vertices, edges) held by the app on `port`, or None if it does not answer."""
+    conn = http.client.HTTPConnection(READY_HOST, port, timeout=5)
+    try:
+        conn.request("GET", MODE.counts_path)
+        response = conn.getresponse()
+        if response.status != 200:
+            return None
+        counts = json.loads(response.read())
+        return counts["vertices"], counts["edges"]
+    except (OSError, http.client.HTTPException, ValueError, KeyError):
+        return None
+    finally:
+        conn.close()
+
+def wait_converged(replica, reference, timeout=CONVERGENCE_TIMEOUT):
+    """
+    Poll MODE.counts_path on both replicas until they hold the same number of vertices
+    and edges. Returns seconds waited, or None on timeout.
+    """
+    start = time.monotonic()
+    delay, max_delay = READY_BACKOFF
+    while True:
+        counts = graph_counts(replica.app_port)
+        if counts is not None and counts == graph_counts(reference.app_port):
+            print(f"✅ {replica.grace_name} matches {reference.grace_name}: {counts[0]} vertices, {counts[1]} edges")
+            return time.monotonic() - start
+        if time.monotonic() - start > timeout:
+            print(f"❌ {replica.grace_name} did not converge with {reference.grace_name} within {timeout}s")
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+def add_replica(dc_name=None):
+    """
+    Add one replica to a running deployment and time how long it takes to catch up.
+    The replica is recorded under extra_replicas in the config file, so later
+    up/down/generate runs include it.
+    """
+    topology = load_topology()
+    config = topology.config
+    if not topology.replicas:
+        print("❌ No existing replica to catch up from")
+        sys.exit(1)
+    if dc_name is None:
+        # fill the datacenter with the fewest replicas
+        per_dc = {}
+        for r in topology.replicas:
+            per_dc.setdefault(r.dc_name, []).append(r)
+        dc_name = min(per_dc, key=lambda name: len(per_dc[name]))
+    number = max(r.number for r in topology.replicas) + 1
+    config.setdefault("extra_replicas", []).append({"number": number, "dc": dc_name})
+    topology = Topology.from_config(config)
+    problems = topology.validate()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    save_config(config)
+    print(f"Adding {MODE.stack_prefix}{number} to {dc_name}")
+
+    start = time.monotonic()
+    results = up_all(topology)
+    result = next((r for r in results if r["stack"] == f"{MODE.stack_prefix}{number}"), None)
+    if result is None or result["rc"] != 0:
+        print(f"❌ {MODE.stack_prefix}{number} did not start")
+        sys.exit(1)
+    replica = next(r for r in topology.replicas if r.number == number)
+    if MODE.counts_path is None:
+        print(f"⚠️ {MODE.name} apps expose no graph counts; not waiting for {replica.grace_name} to catch up")
+        return {"stack": replica.stack_name, "ready": result["seconds"], "converged": None}
+    reference = next(r for r in topology.replicas if r.number != number)
+    converged = wait_converged(replica, reference)
+    if converged is None:
+        sys.exit(1)
+    total = time.monotonic() - start
+    print(f"\n{MODE.stack_prefix}{number}: ready after {result['seconds']:.1f}s, converged after {total:.1f}s")
+    return {"stack": replica.stack_name, "ready": result["seconds"], "converged": total}
+
+def remove_replica(number):
+    """Stop one replica and drop it from the topology recorded in the config file."""
+    topology = load_topology()
+    config = topology.config
+    if number not in [r.number for r in topology.replicas]:
+        print(f"❌ {MODE.stack_prefix}{number} is not part of the deployment")
+        sys.exit(1)
+    extras = config.get("extra_replicas", [])
+    if any(entry["number"] == number for entry in extras):
+        config["extra_replicas"] = [entry for entry in extras if entry["number"] != number]
+    else:
+        config.setdefault("excluded_replicas", []).append(f"{MODE.stack_prefix}{number}")
+    save_config(config)
+    print(f"Removing {MODE.stack_prefix}{number}")
+    return up_all(load_topology())
+
+def is_stack_running(stack_name):
+    """Check if a docker compose project is running."""
+    running = docker_client().containers(
+        all=False, filters={"label": [f"com.docker.compose.project={stack_name}"]})
+    return bool(running)
+
+# Containers started outside compose that a crashed run may leave behind
+def leftover_containers():
+    return re.compile(r"^(snapshot-(neo4j|memgraph|arangodb|mongodb|janusgraph)|(neo4j|memgraph|arangodb|mongodb|janusgraph)\d+"
+                      rf"|lab\d+|preload\d+|{MODE.app_prefix}\d+|wsserver)$")
+
+def deployment_networks():
+    return re.compile(rf"^(Shared_net|{MODE.network_prefix}\d+|Provider_net)$")
+
+def deployment_resources(volumes=False, snapshots=False, leftovers=False):
+    """
+    Containers, networks and volumes of this deployment, found by compose project and
+    grace.* labels. Snapshot volumes are only included with `snapshots`; images never are.
+    """
+    docker = docker_client()
+    stacks, leftover, ours = stack_name_re(), leftover_containers(), deployment_networks()
+    containers = []
+    for container in docker.containers():
+        project = (container.get("Labels") or {}).get("com.docker.compose.project", "")
+        name = (container.get("Names") or ["/"])[0].lstrip("/")
+        if stacks.match(project) or (leftovers and leftover.match(name)):
+            containers.append(name)
+    networks = [
+        n["Name"] for n in docker.networks()
+        if stacks.match((n.get("Labels") or {}).get("com.docker.compose.project", ""))
+        or (n.get("Labels") or {}).get("grace.deployment") or ours.match(n["Name"])
+    ]
+    vols = []
+    if volumes:
+        for volume in docker.volumes():
+            labels = volume.get("Labels") or {}
+            if (stacks.match(labels.get("com.docker.compose.project", "")) or labels.get("grace.clone-of")
+                    or (snapshots and labels.get("grace.snapshot"))):
+                vols.append(volume["Name"])
+    return containers, networks, vols
+
+def remove_all(remove, names, log_path):
+    """Remove `names` concurrently with `remove`; returns how many failed (logged to log_path)."""
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(names)))) as executor:
+        futures = {executor.submit(remove, name): name for name in names}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except DockerError as e:
+                failed += 1
+                with open(log_path, "a") as log:
+                    log.write(f"{futures[future]}: {e}\n")
+    return failed
+
+def teardown(volumes=False, snapshots=False, leftovers=False):
+    """
+    Remove the deployment through the Docker API: containers first (with their anonymous
+    volumes), then networks and volumes, each resource type removed concurrently.
+    """
+    start = time.monotonic()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, "teardown.log")
+    open(log_path, "w").close()
+    docker = docker_client()
+    containers, networks, vols = deployment_resources(volumes, snapshots, leftovers)
+    failed = remove_all(docker.remove_container, containers, log_path)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batches = [executor.submit(remove_all, docker.remove_network, networks, log_path),
+                   executor.submit(remove_all, docker.remove_volume, vols, log_path)]
+        failed += sum(batch.result() for batch in batches)
+    elapsed = time.monotonic() - start
+    print(f"{'✅' if failed == 0 else '❌'} Removed {len(containers)} containers, {len(networks)} networks, "
+          f"{len(vols)} volumes in {elapsed:.1f}s" + (f" ({failed} failed, see {log_path})" if failed else ""))
+    return 1 if failed else 0
+
+def down_all():
+    return teardown()
+
+# `--mock`: one DeploymentCore/mockGrace.py process per replica, on the replica's app port,
+# in place of its database, preload and app containers. No Docker, provider or WAN shaping.
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mockGrace.py")
+MOCK_FILE = os.path.join(LOG_DIR, "mock.json")  # name -> {pid, port} of the running mocks
+MOCK_BANNER = "Mock GRACE app on"  # printed by mockGrace.py once it holds its port
+
+def port_free(port, host="127.0.0.1"):
+    """Whether a server can bind `port`, as mockGrace.py does (SO_REUSEADDR, so TIME_WAIT is no obstacle)."""
+    with socket.socket() as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+def wait_mock(process, log_path, timeout=READY_TIMEOUT):
+    """Wait for the mock to print MOCK_BANNER; False if it exits or times out first."""
+    start = time.monotonic()
+    delay, max_delay = READY_BACKOFF
+    while process.poll() is None:
+        with open(log_path) as log:
+            if MOCK_BANNER in log.read():
+                return True
+        if time.monotonic() - start > timeout:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+    return False
+
+def mock_up(topology=None, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=None):
+    """
+    Replace any running mocks with one per replica and wait until each has bound its port
+    and answers MODE.ready_path. Nothing is started if one of the ports is taken.
+    """
+    topology = topology or load_topology()
+    mock_down(quiet=True)
+    TIMELINE.clear()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    taken = [r for r in topology.replicas if not port_free(r.app_port)]
+    for replica in taken:
+        print(f"❌ Port {replica.app_port} of {replica.grace_name} is already in use")
+    if taken:
+        return False
+    mocks = {}
+    for replica in topology.replicas:
+        cmd = [sys.executable, MOCK_SERVER, "--port", str(replica.app_port),
+               "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms), "--error-rate", str(error_rate)]
+        if seed is not None:
+            cmd += ["--seed", str(seed + replica.number)]
+        log_path = os.path.join(LOG_DIR, f"mock-{replica.grace_name}.log")
+        with open(log_path, "w") as log:
+            process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        mocks[replica.grace_name] = {"process": process, "pid": process.pid, "port": replica.app_port,
+                                     "start": time.time(), "log": log_path}
+    with open(MOCK_FILE, "w") as f:
+        json.dump({name: {"pid": m["pid"], "port": m["port"]} for name, m in mocks.items()}, f, indent=2)
+
+    ok = True
+    for replica in topology.replicas:
+        mock = mocks[replica.grace_name]
+        seconds = None
+        if wait_mock(mock["process"], mock["log"]):
+            seconds = wait_ready("http", mock["port"], MODE.ready_path)
+        if mock["process"].poll() is not None:
+            seconds = None
+        record_phase(replica.stack_name, replica.grace_name, "ready", mock["start"], seconds is not None)
+        if seconds is None:
+            print(f"❌ Mock {replica.grace_name} not ready on port {mock['port']} (log: {mock['log']})")
+            ok = False
+        else:
+            print(f"✅ Mock {replica.grace_name} on port {mock['port']} (pid {mock['pid']})")
+    write_timeline()
+    return ok
+
+def mock_down(quiet=False):
+    """Stop the mocks recorded in MOCK_FILE."""
+    if not os.path.isfile(MOCK_FILE):
+        if not quiet:
+            print("No mock replicas running")
+        return
+    with open(MOCK_FILE) as f:
+        mocks = json.load(f)
+    for name, mock in mocks.items():
+        # the pid may have been reused since; only signal it if it is still our server
+        try:
+            with open(f"/proc/{mock['pid']}/cmdline", "rb") as f:
+                ours = os.path.basename(MOCK_SERVER).encode() in f.read()
+        except OSError:
+            ours = False
+        if ours:
+            try:
+                os.killpg(mock["pid"], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if not quiet:
+            print(f"🛑 Stopped mock {name} on port {mock['port']}")
+    os.remove(MOCK_FILE)
+        
+def force_clean(prune=False, drop_snapshots=False):
+  # Also catches containers from crashed runs and the per-replica data volumes.
+  # Snapshot volumes and built images are kept so the next `up` does not redo them.
+  teardown(volumes=True, snapshots=drop_snapshots, leftovers=True)
+
+  if prune:
+    # Removes *every* unused container, image and volume on the host, not just ours
+    run_command(["docker", "container", "prune", "-f"])
+    run_command(["docker", "image", "prune", "-f"])
+    run_command(["docker", "volume", "prune", "-f"])
+  
+
+def main(mode):
+    """Command line of an architecture's Deployment.py."""
+    global MODE, VERBOSE, PARALLEL, COMPOSE_WAIT, PATH, PRELOAD_DATA
+    import argparse
+    MODE = mode
+    parser = argparse.ArgumentParser(description=f"Deploy a {mode.name} cluster.")
+    parser.add_argument("command", choices=["generate","up", "down", "force-clean","rebuild","snapshot","add-replica","remove-replica","wan"], help="Deployment Actions.")
+    parser.add_argument("distconf", help="Distribution configuration file", default="DistributionConfig.json", nargs='?')
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show full output when deploying.")
+    parser.add_argument("-j", "--parallel", type=int, default=PARALLEL, help="Replica stacks to bring up concurrently.")
+    parser.add_argument("--compose-wait", action="store_true", help="Start whole stacks and rely on compose healthchecks instead of readiness probes.")
+    parser.add_argument("--dc", help="add-replica: datacenter to add the replica to (default: the one with fewest replicas).")
+    parser.add_argument("--replica", type=int, help="remove-replica: number of the replica to remove, as in the stack name <N>.")
+    parser.add_argument("--prune", action="store_true", help="force-clean: also prune all unused containers, images and volumes on the host.")
+    parser.add_argument("--drop-snapshots", action="store_true", help="force-clean: also remove dataset snapshot volumes.")
+    parser.add_argument("--force", action="store_true", help="snapshot: rebuild snapshot volumes that already exist.")
+    parser.add_argument("--mock", action="store_true", help="up/down/rebuild: run an in-memory mock app per replica as a local process instead of Docker stacks.")
+    parser.add_argument("--mock-latency-ms", type=float, default=0.0, help="--mock: delay added to every API request.")
+    parser.add_argument("--mock-jitter-ms", type=float, default=0.0, help="--mock: uniform +/- variation of the delay.")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="--mock: fraction of API requests failed with a 500.")
+    parser.add_argument("--mock-seed", type=int, help="--mock: seed for jitter and injected errors (offset by replica number).")
+    
+    # parser.add_argument("-b", "--benchmark", action="store_true", help="Preload the database with snapshot data.")
+    args = parser.parse_args()
+
+    VERBOSE = args.verbose 
+    PARALLEL = args.parallel
+    COMPOSE_WAIT = args.compose_wait
+    command = args.command
+    PATH= args.distconf
+    PRELOAD_DATA = os.environ.get("PRELOAD_DATA", False)
+
+    if args.mock:
+        if command not in ("up", "down", "rebuild"):
+            parser.error("--mock applies to up, down and rebuild")
+        if command in ("down", "rebuild"):
+            mock_down()
+        if command in ("up", "rebuild") and not mock_up(latency_ms=args.mock_latency_ms, jitter_ms=args.mock_jitter_ms,
+                                                        error_rate=args.mock_error_rate, seed=args.mock_seed):
+            sys.exit(1)
+        return
+    if not docker_client().ping():
+        print(f"❌ Cannot reach the Docker daemon at {docker_client().host}")
+        sys.exit(1)
+
+    # BENCHMARK = args.benchmark
+    
+    if command == "generate":
+        generate_all()
+    elif command == "up":
+        up_all()
+    elif command == "snapshot":
+        snapshot_all(args.force)
+    elif command == "add-replica":
+        add_replica(args.dc)
+    elif command == "remove-replica":
+        if args.replica is None:
+            parser.error("remove-replica needs --replica N")
+        remove_replica(args.replica)
+    elif command == "wan":
+        topology = load_topology()
+        if not topology.config.get("wan_latency"):
+            print(f"⚠️ No wan_latency in {PATH}, nothing to shape")
+        elif not apply_wan(topology):
+            sys.exit(1)
+    elif command == "down":
+        down_all()
+    elif command == "force-clean":    
+        force_clean(args.prune, args.drop_snapshots)
+    elif command == "rebuild":
+        down_all()
+        up_all()
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
\ No newline at end of file
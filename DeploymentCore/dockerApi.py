@@ -0,0 +1,174 @@
+"""Minimal Docker Engine API client over the daemon socket.
+
+Status checks and resource listing go through one keep-alive HTTP connection per thread
+instead of forking the docker CLI for every call. Only what the deployment scripts need
+is covered (containers, images, volumes, networks); compose, build, run and exec still
+go through the CLI.
+
+The daemon is taken from DOCKER_HOST (unix:// or tcp://), defaulting to
+unix:///var/run/docker.sock.
+"""
+import os
+import json
+import socket
+import threading
+import http.client
+from urllib.parse import quote, urlencode
+
+DEFAULT_HOST = "unix:///var/run/docker.sock"
+TIMEOUT = 60  # seconds per request; `wait` has no timeout
+
+
+class DockerError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class DockerClient:
+    def __init__(self, host=None):
+        self.host = host or os.environ.get("DOCKER_HOST") or DEFAULT_HOST
+        self._local = threading.local()
+
+    def _connect(self, timeout):
+        if self.host.startswith("unix://"):
+            return UnixHTTPConnection(self.host[len("unix://"):], timeout=timeout)
+        if self.host.startswith("tcp://"):
+            return http.client.HTTPConnection(self.host[len("tcp://"):], timeout=timeout)
+        raise DockerError(0, f"unsupported DOCKER_HOST {self.host}")
+
+    def request(self, method, path, query=None, body=None, timeout=TIMEOUT):
+        """Send one request; returns (status, decoded JSON or None). Retries once on a stale connection."""
+        if query:
+            path += "?" + urlencode({k: v for k, v in query.items() if v is not None})
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        reuse = timeout == TIMEOUT
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None) if reuse else None
+            kept_alive = conn is not None
+            if conn is None:
+                conn = self._connect(timeout)
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if reuse:
+                    self._local.conn = None
+                if kept_alive and attempt == 0:
+                    continue  # the daemon closed the idle keep-alive connection
+                raise DockerError(0, f"cannot reach {self.host}: {e}") from None
+            if reuse:
+                self._local.conn = conn
+            else:
+                conn.close()
+            break
+        if not data:
+            return response.status, None
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, data.decode(errors="replace")
+
+    def _call(self, method, path, query=None, body=None, ok=(200, 201, 204), timeout=TIMEOUT):
+        status, data = self.request(method, path, query, body, timeout)
+        if status not in ok:
+            message = data.get("message") if isinstance(data, dict) else data
+            raise DockerError(status, message)
+        return status, data
+
+    @staticmethod
+    def _filters(filters):
+        return json.dumps(filters) if filters else None
+
+    def ping(self):
+        try:
+            return self.request("GET", "/_ping")[0] == 200
+        except DockerError:
+            return False
+
+    # Containers
+
+    def containers(self, all=True, filters=None):
+        """Container summaries as returned by GET /containers/json (Id, Names, Labels, State, ...)."""
+        return self._call("GET", "/containers/json", {"all": int(all), "filters": self._filters(filters)})[1]
+
+    def inspect_container(self, name):
+        """Full inspect document, or None if there is no such container."""
+        status, data = self._call("GET", f"/containers/{quote(name)}/json", ok=(200, 404))
+        return data if status == 200 else None
+
+    def remove_container(self, name, force=True, volumes=True):
+        """Remove a container; returns False if it was already gone."""
+        status, _ = self._call("DELETE", f"/containers/{quote(name)}",
+                               {"force": int(force), "v": int(volumes)}, ok=(204, 404))
+        return status == 204
+
+    def wait_container(self, name):
+        """Block until the container exits; returns its exit code."""
+        return self._call("POST", f"/containers/{quote(name)}/wait", timeout=None)[1]["StatusCode"]
+
+    # Images
+
+    def image_exists(self, name):
+        return self._call("GET", f"/images/{quote(name)}/json", ok=(200, 404))[0] == 200
+
+    # Volumes
+
+    def volumes(self, filters=None):
+        return self._call("GET", "/volumes", {"filters": self._filters(filters)})[1].get("Volumes") or []
+
+    def volume_exists(self, name):
+        return self._call("GET", f"/volumes/{quote(name)}", ok=(200, 404))[0] == 200
+
+    def inspect_volume(self, name):
+        """Volume details, or None if there is no such volume."""
+        status, data = self._call("GET", f"/volumes/{quote(name)}", ok=(200, 404))
+        return data if status == 200 else None
+
+    def create_volume(self, name, labels=None):
+        return self._call("POST", "/volumes/create", body={"Name": name, "Labels": labels or {}})[1]
+
+    def remove_volume(self, name, force=True):
+        status, _ = self._call("DELETE", f"/volumes/{quote(name)}", {"force": int(force)}, ok=(204, 404))
+        return status == 204
+
+    # Networks
+
+    def networks(self, filters=None):
+        return self._call("GET", "/networks", {"filters": self._filters(filters)})[1]
+
+    def create_network(self, name, labels=None):
+        """Create a bridge network; returns False if one with that name already exists."""
+        status, _ = self._call("POST", "/networks/create",
+                               body={"Name": name, "CheckDuplicate": True, "Labels": labels or {}}, ok=(201, 409))
+        return status == 201
+
+    def remove_network(self, name):
+        status, _ = self._call("DELETE", f"/networks/{quote(name)}", ok=(204, 404))
+        return status == 204
+
+
+_client = None
+
+
+def docker_client():
+    """Process-wide client, created on first use."""
+    global _client
+    if _client is None:
+        _client = DockerClient()
+    return _client
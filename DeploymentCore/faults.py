@@ -0,0 +1,642 @@
+"""Declarative, seeded fault injection against a running deployment.
+
+A fault plan (JSON) lists faults with a type, a target, a start offset and a duration,
+all in seconds from the moment the plan starts:
+
+    {
+      "seed": 7,
+      "faults": [
+        {"type": "partition", "target": "Grace3", "start": 30, "duration": 60},
+        {"type": "latency", "target": "DC2", "start": 45, "duration": 30, "delay_ms": 300, "jitter_ms": 50},
+        {"type": "loss", "target": "DC1-replica-1", "start": 45, "duration": 30, "loss_pct": 20},
+        {"type": "pause", "target": "Grace5", "start": 120, "duration": 15},
+        {"type": "kill", "target": "Grace6", "start": 150, "duration": 20},
+        {"type": "split", "groups": [["DC1", "DC2", "provider"], ["DC3"]], "start": 200, "duration": 60}
+      ],
+      "random": {"count": 4, "types": ["partition", "latency"], "exclude": ["Grace1"],
+                 "start": [0, 300], "duration": [30, 120]}
+    }
+
+Targets are container names, replica ids (DC1-replica-0), datacenter names (every
+replica of the datacenter), "provider", or in leader-follower deployments "leader" and
+"followers", found from the LEADER_URI of the running apps when the plan starts.
+`random` adds `count` faults drawn from the seed, so the same plan and seed always
+inject the same faults at the same offsets.
+
+partition disconnects the target from Shared_net, latency and loss add netem on top of
+any WAN shaping (overlapping ones on a container combine), pause freezes the container
+and kill stops it, restarting it when the fault ends. split cuts the traffic between
+groups of targets and nothing else: each member drops packets from and to the Shared_net
+addresses of the other groups, so replicas keep their databases. "groups": "datacenters"
+makes every datacenter its own group, cutting cross-datacenter traffic only. GRACE
+replicas replicate only through the provider, so with one a split must put "provider"
+in a group ("datacenters" adds it to the group of "provider_dc"): that group keeps
+replicating, while every other group is cut off from all replicas outside it. Faults run concurrently, one thread each; every
+inject and heal is appended to a JSON lines timeline with its planned and actual
+wall-clock time. Interrupting the run heals whatever is active.
+
+A fault with "repeat": n and "every": s is injected n times, s seconds apart. A fault
+with "probe": <target> sends writes through the target replicas' apps from the moment
+it is injected until one succeeds, and records how long that took for each of them;
+each accepted probe vertex is deleted again. This is write availability as a client of
+that replica sees it, not failover time: leader-follower followers apply a write
+locally before forwarding it, so they may accept writes while the leader is cut off.
+
+    {"type": "partition", "target": "leader", "start": 30, "duration": 20,
+     "probe": "followers", "repeat": 10, "every": 60}
+
+The run ends with statistics of those write availability times, which --stats prints
+again for any timeline.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+import statistics
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+from . import deploy
+from .dockerApi import docker_client, DockerError
+
+FAULT_TYPES = ("partition", "latency", "loss", "pause", "kill", "split")
+EXCLUSIVE_FAULTS = ("partition", "pause", "kill", "split")  # at most one of these per container at a time
+TIMELINE_FILE = os.path.join(deploy.LOG_DIR, "faults.jsonl")
+# Ranges `random` faults are drawn from unless the plan gives its own
+RANDOM_DEFAULTS = {"start": [0, 300], "duration": [30, 120], "delay_ms": [100, 500], "loss_pct": [5, 30]}
+RANDOM_ATTEMPTS = 20  # draws per random fault before an overlapping one is kept and reported
+ROLES = {}  # "leader" / "followers" -> app containers, filled by discover_roles
+PROBE_INTERVAL = 0.2  # seconds between write probes
+PROBE_TIMEOUT = 2  # seconds a probe write may take
+PROBE_GRACE = 60  # seconds after the heal a replica still has to accept a write
+
+
+@dataclass
+class Fault:
+    id: int
+    type: str
+    target: str  # as written in the plan
+    containers: list
+    start: float
+    duration: float
+    params: dict = field(default_factory=dict)
+    groups: list = field(default_factory=list)  # split: containers of each side
+    probe: list = field(default_factory=list)  # apps written through until one accepts a write
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def netem(self):
+        """The fault as a netem link for deploy.shaping_script."""
+        return {key: self.params[key] for key in deploy.WAN_KEYS if key in self.params}
+
+    def describe(self):
+        extra = " ".join(f"{key}={value}" for key, value in self.params.items())
+        return f"#{self.id} {self.type} {self.target}" + (f" ({extra})" if extra else "")
+
+    def chain(self):
+        """iptables chain holding a split's rules, named after the fault so heals never touch other rules."""
+        return f"GRACE_SPLIT_{self.id}"
+
+
+def leader_uri(replica):
+    """The leader URI `replica`'s app was started with, from the container or its compose file."""
+    info = None
+    try:
+        info = docker_client().inspect_container(replica.grace_name)
+    except DockerError:
+        pass
+    for item in ((info or {}).get("Config") or {}).get("Env") or []:
+        key, _, value = item.partition("=")
+        if key == deploy.MODE.leader_env:
+            return value
+    try:
+        with open(replica.compose_file) as f:
+            for line in f:
+                key, _, value = line.strip().partition(":")
+                if key == deploy.MODE.leader_env:
+                    return value.strip().strip('"')
+    except OSError:
+        pass
+    return None
+
+
+def discover_roles(topology):
+    """Fill ROLES from the apps' leader URIs; returns a problem, or None."""
+    ROLES.clear()
+    if not deploy.MODE.leader_env:
+        return None
+    names = {r.grace_name for r in topology.replicas}
+    # netloc rather than hostname, which lowercases the container name
+    leaders = {urlsplit(uri).netloc.rsplit("@", 1)[-1].split(":")[0] for uri in map(leader_uri, topology.replicas) if uri}
+    if len(leaders) != 1 or not leaders <= names:
+        return f"cannot tell the leader from {deploy.MODE.leader_env} (found {', '.join(sorted(map(str, leaders))) or 'nothing'})"
+    leader = leaders.pop()
+    ROLES["leader"] = [leader]
+    ROLES["followers"] = [r.grace_name for r in topology.replicas if r.grace_name != leader]
+    return None
+
+
+def resolve_target(topology, target):
+    """Containers a plan target stands for, or None if it names nothing in the topology."""
+    if target in ROLES:
+        return list(ROLES[target]) or None
+    if target == "provider":
+        return ["wsserver"] if topology.provider else None
+    replicas = [r for r in topology.replicas if target in (r.dc_name, r.replica_id)]
+    if replicas:
+        return [r.grace_name for r in replicas]
+    known = {name for r in topology.replicas for name in (r.grace_name, r.db_name)}
+    return [target] if target in known else None
+
+
+def resolve_groups(topology, groups):
+    """Containers of each side of a split, or (None, problem) if the groups are unusable."""
+    if groups == "datacenters":
+        groups = [[dc] + (["provider"] if topology.provider and dc == deploy.provider_dc(topology.config) else [])
+                  for dc in sorted({r.dc_name for r in topology.replicas})]
+    if not isinstance(groups, list) or len(groups) < 2 or not all(isinstance(g, list) and g for g in groups):
+        return None, "split faults need \"groups\": \"datacenters\" or a list of at least two non-empty target lists"
+    sides, seen = [], {}
+    for group in groups:
+        side = []
+        for target in group:
+            containers = resolve_target(topology, target)
+            if not containers:
+                return None, f"split target {target!r} is not a container, replica id, datacenter or provider of the deployment"
+            side += [c for c in containers if c not in side]
+        for c in side:
+            if c in seen:
+                return None, f"{c} is in more than one split group"
+            seen[c] = True
+        sides.append(side)
+    if topology.provider and "wsserver" not in seen:
+        return None, ("replicas replicate only through the provider, so a split must put \"provider\" in one "
+                      "of the groups; the other groups are then cut off from every replica outside them")
+    return sides, None
+
+
+def split_label(groups):
+    if groups == "datacenters":
+        return "datacenters"
+    return " | ".join("+".join(group) for group in groups)
+
+
+def entry_containers(topology, entry):
+    """Containers a plan entry touches, for overlap checks while drawing random faults."""
+    if entry.get("type") == "split":
+        return {c for side in resolve_groups(topology, entry.get("groups"))[0] or [] for c in side}
+    return set(resolve_target(topology, entry.get("target")) or [])
+
+
+def draw_random(spec, topology, rng, planned):
+    """
+    Plan entries for a `random` section, drawn from `rng`. A draw that would overlap an
+    exclusive fault already planned on the same containers is redrawn, a few times at most.
+    A random split cuts the datacenters into two random sides, the provider staying with
+    its datacenter.
+    """
+    exclude = set(spec.get("exclude", []))
+    targets = spec.get("targets") or [r.grace_name for r in topology.replicas]
+    targets = sorted(t for t in targets if t not in exclude)
+    types = spec.get("types") or ["partition"]
+    ranges = {key: spec.get(key, default) for key, default in RANDOM_DEFAULTS.items()}
+    dcs = sorted({r.dc_name for r in topology.replicas})
+    busy = [(entry_containers(topology, e), e.get("start", 0), e.get("start", 0) + e.get("duration", 0))
+            for e in planned if e.get("type") in EXCLUSIVE_FAULTS]
+    entries = []
+    if not targets:
+        return entries
+    for k in range(spec.get("count", 1)):
+        for attempt in range(RANDOM_ATTEMPTS):
+            kind = rng.choice(types)
+            entry = {"type": kind, "target": rng.choice(targets),
+                     "start": round(rng.uniform(*ranges["start"]), 1),
+                     "duration": round(rng.uniform(*ranges["duration"]), 1)}
+            if kind == "split" and len(dcs) >= 2:
+                sides = rng.sample(dcs, len(dcs))
+                cut = rng.randint(1, len(dcs) - 1)
+                entry["groups"] = [sorted(sides[:cut]), sorted(sides[cut:])]
+                if topology.provider:
+                    home = deploy.provider_dc(topology.config)
+                    next((g for g in entry["groups"] if home in g), entry["groups"][0]).append("provider")
+                del entry["target"]
+            if kind not in EXCLUSIVE_FAULTS:
+                break
+            containers = entry_containers(topology, entry)
+            end = entry["start"] + entry["duration"]
+            if not any(containers & c and entry["start"] < e and s < end for c, s, e in busy):
+                busy.append((containers, entry["start"], end))
+                break
+        if kind == "latency":
+            entry["delay_ms"] = round(rng.uniform(*ranges["delay_ms"]))
+        elif kind == "loss":
+            entry["loss_pct"] = round(rng.uniform(*ranges["loss_pct"]), 1)
+        entries.append(entry)
+    return entries
+
+
+def expand_plan(plan, topology):
+    """The plan's faults, random ones included, sorted by start; returns (faults, problems)."""
+    rng = random.Random(plan.get("seed", 0))
+    entries, problems = [], []
+    for entry in plan.get("faults", []):
+        repeat, every = entry.get("repeat", 1), entry.get("every", 0)
+        if not isinstance(repeat, int) or repeat < 1 or not isinstance(every, (int, float)) or (repeat > 1 and every <= 0):
+            problems.append(f"fault at {entry.get('start', 0)}s: repeat must be a count >= 1 and every a number of seconds > 0")
+            continue
+        entry = {key: value for key, value in entry.items() if key not in ("repeat", "every")}
+        if repeat > 1:
+            entry.pop("id", None)  # the copies get ids of their own
+        entries += [dict(entry, start=entry.get("start", 0) + k * every) for k in range(repeat)]
+    if plan.get("random"):
+        entries += draw_random(plan["random"], topology, rng, entries)
+    # one counter for every fault without an id, skipping the ids the plan gives
+    for entry in [e for e in entries if "id" in e and (type(e["id"]) is not int or e["id"] < 1)]:
+        problems.append(f"fault id {entry['id']!r} must be a positive integer")
+        entries.remove(entry)
+    explicit = [entry["id"] for entry in entries if "id" in entry]
+    for fault_id in sorted({i for i in explicit if explicit.count(i) > 1}):
+        problems.append(f"fault id {fault_id} is used by more than one fault")
+    counter = (i for i in itertools.count(1) if i not in explicit)
+    entries = [entry if "id" in entry else dict(entry, id=next(counter)) for entry in entries]
+    faults = []
+    for entry in entries:
+        name = f"fault {entry['id']}"
+        kind = entry.get("type")
+        if kind not in FAULT_TYPES:
+            problems.append(f"{name}: unknown type {kind!r}, expected one of {', '.join(FAULT_TYPES)}")
+            continue
+        groups = []
+        if kind == "split":
+            groups, problem = resolve_groups(topology, entry.get("groups"))
+            if problem:
+                problems.append(f"{name}: {problem}")
+                continue
+            containers = [c for side in groups for c in side]
+            entry.setdefault("target", split_label(entry["groups"]))
+        else:
+            containers = resolve_target(topology, entry.get("target"))
+        if not containers:
+            problems.append(f"{name}: target {entry.get('target')!r} is not a container, replica id or datacenter of the deployment")
+            continue
+        start, duration = entry.get("start", 0), entry.get("duration")
+        if not isinstance(start, (int, float)) or start < 0:
+            problems.append(f"{name}: start must be a number of seconds >= 0")
+            continue
+        if not isinstance(duration, (int, float)) or duration <= 0:
+            problems.append(f"{name}: duration must be a number of seconds > 0")
+            continue
+        params = {key: entry[key] for key in deploy.WAN_KEYS if key in entry}
+        if kind == "latency" and not params.get("delay_ms"):
+            problems.append(f"{name}: latency faults need delay_ms")
+        if kind == "loss" and not 0 < params.get("loss_pct", 0) <= 100:
+            problems.append(f"{name}: loss faults need loss_pct in (0, 100]")
+        probe = []
+        if entry.get("probe"):
+            apps = {r.grace_name for r in topology.replicas}
+            probe = resolve_target(topology, entry["probe"])
+            if not probe or not set(probe) <= apps:
+                problems.append(f"{name}: probe {entry['probe']!r} must name replicas of the deployment")
+                continue
+        faults.append(Fault(entry["id"], kind, entry["target"], containers, start, duration, params, groups, probe))
+    faults.sort(key=lambda f: (f.start, f.id))
+    for i, a in enumerate(faults):
+        for b in faults[i + 1:]:
+            if (a.type in EXCLUSIVE_FAULTS and b.type in EXCLUSIVE_FAULTS and b.start < a.end
+                    and set(a.containers) & set(b.containers)):
+                problems.append(f"fault {a.id} ({a.type}) and fault {b.id} ({b.type}) overlap on "
+                                f"{', '.join(sorted(set(a.containers) & set(b.containers)))}")
+    return faults, problems
+
+
+def split_script(chain, blocked=None):
+    """
+    Shell script that installs (with the addresses to `blocked`) or removes a split's
+    iptables chain. Each is a single iptables-restore commit, so a container's side of
+    the split comes and goes at once and rules outside the chain are left alone.
+    """
+    if blocked is None:
+        rules = [f"-D INPUT -j {chain}", f"-D OUTPUT -j {chain}", f"-F {chain}", f"-X {chain}"]
+    else:
+        rules = ([f":{chain} - [0:0]"] + [f"-A {chain} -s {ip}/32 -j DROP" for ip in blocked]
+                 + [f"-A {chain} -d {ip}/32 -j DROP" for ip in blocked] + [f"-I INPUT -j {chain}", f"-I OUTPUT -j {chain}"])
+    return "iptables-restore --noflush <<'EOF'\n*filter\n" + "\n".join(rules) + "\nCOMMIT\nEOF\n"
+
+
+class FaultRunner:
+    """Runs expanded faults against the live deployment and writes the timeline."""
+
+    def __init__(self, topology, timeline_path=TIMELINE_FILE):
+        self.topology = topology
+        self.replicas = {r.grace_name: r for r in topology.replicas}
+        self.addresses = {}
+        self.netem = {}  # container -> active netem faults
+        self.locks = {}  # container -> lock serialising its docker calls
+        self.state_lock = threading.Lock()
+        self.stop = threading.Event()
+        self.done = threading.Event()  # set once every fault has healed or been skipped
+        self.pending = 0
+        self.timeline_path = timeline_path
+        self.timeline_lock = threading.Lock()
+        self.healed = {}  # fault id -> wall-clock time its heal finished
+        self.t0 = self.wall0 = None
+
+    def lock(self, container):
+        with self.state_lock:
+            return self.locks.setdefault(container, threading.Lock())
+
+    def docker(self, *args):
+        result = subprocess.run(["docker", *args], capture_output=True, text=True)
+        return result.returncode, (result.stderr or result.stdout).strip()
+
+    def address(self, container, refresh=False):
+        """Shared_net address of `container`, looked up once and again after it reconnects."""
+        if refresh or container not in self.addresses:
+            info = docker_client().inspect_container(container)
+            network = ((info or {}).get("NetworkSettings", {}).get("Networks") or {}).get("Shared_net") or {}
+            self.addresses[container] = network.get("IPAddress")
+        return self.addresses[container]
+
+    def reshape(self, container):
+        """Reinstall `container`'s WAN shaping plus all netem faults active on it."""
+        active = self.netem.get(container) or []
+        fault = None
+        for f in active:
+            fault = deploy.combine_links(fault, f.netem()) if fault else f.netem()
+        replica = self.replicas.get(container)
+        shaped = replica or (container == "wsserver" and self.topology.provider)
+        if shaped and self.topology.config.get("wan_latency"):
+            addresses = {name: self.address(name) for name in self.shaped()}
+            if None in addresses.values():
+                return 1, "a shaped container has no Shared_net address"
+            if replica:
+                script = deploy.wan_script(replica, self.topology, addresses, fault)
+            else:
+                script = deploy.provider_script(self.topology, addresses, fault)
+        else:
+            ip = self.address(container)
+            if ip is None:
+                return 1, f"{container} has no Shared_net address"
+            script = deploy.shaping_script(ip, [], fault)
+        return self.docker("exec", container, "sh", "-c", script)
+
+    def shaped(self):
+        """Containers with WAN shaping: the replicas and, with a provider, wsserver."""
+        return list(self.replicas) + (["wsserver"] if self.topology.provider else [])
+
+    def reshape_peers(self, container, old):
+        """After `container` rejoined Shared_net with a new address, point the peers' WAN filters at it."""
+        if self.address(container) == old or not self.topology.config.get("wan_latency"):
+            return
+        for name in self.shaped():
+            if name != container:
+                with self.lock(name):
+                    self.reshape(name)
+
+    def inject_one(self, fault, container):
+        with self.lock(container):
+            if fault.type == "partition":
+                return self.docker("network", "disconnect", "Shared_net", container)
+            if fault.type == "pause":
+                return self.docker("pause", container)
+            if fault.type == "kill":
+                return self.docker("kill", container)
+            if fault.type == "split":
+                blocked = [self.address(c) for side in fault.groups if container not in side for c in side]
+                if None in blocked:
+                    return 1, "a container of another group has no Shared_net address"
+                return self.docker("exec", container, "sh", "-c", split_script(fault.chain(), blocked))
+            self.netem.setdefault(container, []).append(fault)
+            return self.reshape(container)
+
+    def heal_one(self, fault, container):
+        with self.lock(container):
+            if fault.type == "partition":
+                rc, output = self.docker("network", "connect", "Shared_net", container)
+            elif fault.type == "pause":
+                return self.docker("unpause", container)
+            elif fault.type == "kill":
+                rc, output = self.docker("start", container)
+            elif fault.type == "split":
+                return self.docker("exec", container, "sh", "-c", split_script(fault.chain()))
+            else:
+                self.netem[container].remove(fault)
+                return self.reshape(container)
+            if rc != 0:
+                return rc, output
+            # a fresh interface has no shaping: reinstall the WAN and any netem fault on it
+            old = self.addresses.get(container)
+            self.address(container, refresh=True)
+            if self.topology.config.get("wan_latency") or self.netem.get(container):
+                rc, output = self.reshape(container)
+        self.reshape_peers(container, old)
+        return rc, output
+
+    def apply(self, fault, event):
+        """Inject or heal `fault` on all its containers at once and record the outcome."""
+        planned = self.wall0 + (fault.start if event == "inject" else fault.end)
+        if fault.type == "split" and event == "inject":
+            for container in fault.containers:  # look the addresses up before any side starts dropping
+                self.address(container)
+        issued = time.time()
+        action = self.inject_one if event == "inject" else self.heal_one
+        with ThreadPoolExecutor(max_workers=len(fault.containers)) as executor:
+            results = list(executor.map(lambda c: action(fault, c), fault.containers))
+        done = time.time()
+        errors = {c: output for c, (rc, output) in zip(fault.containers, results) if rc != 0}
+        self.record({"fault": fault.id, "type": fault.type, "target": fault.target, "containers": fault.containers,
+                     "event": event, "planned": planned, "issued": issued, "at": done,
+                     "offset": done - self.wall0, "ok": not errors, "errors": errors, **fault.params,
+                     **({"groups": fault.groups} if fault.groups else {})})
+        mark = ("🚫" if event == "inject" else "✨") if not errors else "❌"
+        print(f"{mark} {done - self.wall0:7.1f}s {event:<6} {fault.describe()}"
+              + (f": {'; '.join(f'{c}: {e}' for c, e in errors.items())}" if errors else ""))
+        return done
+
+    def post(self, container, path, body):
+        """POST `body` to `container`'s app; True if it answered 200."""
+        conn = http.client.HTTPConnection(deploy.READY_HOST, self.replicas[container].app_port, timeout=PROBE_TIMEOUT)
+        try:
+            conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+            return conn.getresponse().status == 200
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+    def write(self, container, key):
+        """One probe write through `container`'s app; True if it was accepted."""
+        return self.post(container, "/api/addVertex", {"label": "FaultProbe", "properties": {"id": key}})
+
+    def probe_writes(self, fault, container, injected):
+        """Write through `container` from `injected` on until a write is accepted, and record how long it took."""
+        deadline = self.wall0 + fault.end + PROBE_GRACE
+        attempts, ok = 0, False
+        while not ok and not self.stop.is_set() and time.time() < deadline:
+            attempts += 1
+            key = f"fault-probe-{self.wall0:.0f}-{fault.id}-{container}-{attempts}"
+            ok = self.write(container, key)
+            if not ok:
+                self.stop.wait(PROBE_INTERVAL)
+        at = time.time()
+        cleaned = ok and self.post(container, "/api/deleteVertex", {"id": key})
+        healed = self.healed.get(fault.id)
+        self.record({"fault": fault.id, "type": fault.type, "target": fault.target, "event": "write", "via": container,
+                     "at": at, "offset": at - self.wall0, "after": at - injected, "attempts": attempts, "ok": ok,
+                     "healed": healed is not None and healed <= at, "interrupted": not ok and self.stop.is_set(),
+                     "cleaned": cleaned})
+        if ok:
+            print(f"✍️ {at - self.wall0:7.1f}s write  {fault.describe()} via {container} after {at - injected:.2f}s ({attempts} attempts)"
+                  + ("" if cleaned else f"; could not delete probe vertex {key}"))
+        elif not self.stop.is_set():
+            print(f"❌ {at - self.wall0:7.1f}s write  {fault.describe()} via {container}: no write accepted "
+                  f"within {PROBE_GRACE}s of the heal")
+
+    def record(self, entry):
+        with self.timeline_lock:
+            with open(self.timeline_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def wait_until(self, offset):
+        """Sleep until `offset` seconds into the plan; False if the run was interrupted first."""
+        return not self.stop.wait(max(0.0, self.t0 + offset - time.monotonic()))
+
+    def run_fault(self, fault):
+        try:
+            if not self.wait_until(fault.start):
+                return
+            injected = self.apply(fault, "inject")
+            probes = [threading.Thread(target=self.probe_writes, args=(fault, c, injected)) for c in fault.probe]
+            for probe in probes:
+                probe.start()
+            self.wait_until(fault.end)
+            self.healed[fault.id] = self.apply(fault, "heal")
+            for probe in probes:
+                probe.join()
+        finally:
+            with self.state_lock:
+                self.pending -= 1
+                if not self.pending:
+                    self.done.set()
+
+    def run(self, faults):
+        """Run every fault on its own thread; on Ctrl-C heal the active ones right away."""
+        os.makedirs(os.path.dirname(self.timeline_path) or ".", exist_ok=True)
+        self.t0, self.wall0 = time.monotonic(), time.time()
+        self.record({"event": "start", "at": self.wall0, "faults": len(faults)})
+        self.pending = len(faults)
+        if not faults:
+            self.done.set()
+        for fault in faults:
+            threading.Thread(target=self.run_fault, args=(fault,)).start()
+        # Wait on an event rather than Thread.join: a Ctrl-C inside join can make later joins return early.
+        try:
+            while not self.done.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\n⚠️ Interrupted, healing active faults ...")
+            self.stop.set()
+            self.done.wait()
+        self.record({"event": "end", "at": time.time(), "interrupted": self.stop.is_set()})
+        print(f"Fault timeline written to {self.timeline_path}")
+        if any(fault.probe for fault in faults):
+            print_stats(write_stats(self.timeline_path, self.wall0))
+
+
+def print_plan(faults):
+    print(f"{'#':>3}  {'start':>7}  {'end':>7}  {'type':<9}  {'target':<16}  containers")
+    for f in faults:
+        extra = " ".join(f"{key}={value}" for key, value in f.params.items())
+        if f.probe:
+            extra += f" probe={','.join(f.probe)}"
+        containers = " | ".join(", ".join(side) for side in f.groups) if f.groups else ", ".join(f.containers)
+        print(f"{f.id:>3}  {f.start:7.1f}  {f.end:7.1f}  {f.type:<9}  {f.target:<16}  {containers}  {extra}")
+
+
+def write_stats(path=TIMELINE_FILE, since=0):
+    """Write availability times of the probed faults in a timeline, aggregated per fault type and target."""
+    groups = {}
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("event") == "write" and entry["at"] >= since and not entry.get("interrupted"):
+                groups.setdefault((entry["type"], entry["target"]), []).append(entry)
+    stats = []
+    for (kind, target), entries in sorted(groups.items()):
+        times = sorted(e["after"] for e in entries if e["ok"])
+        stats.append({
+            "type": kind, "target": target, "probes": len(entries), "failed": len(entries) - len(times),
+            "after_heal": sum(1 for e in entries if e["ok"] and e["healed"]),
+            "min": times[0] if times else None, "median": statistics.median(times) if times else None,
+            "mean": statistics.mean(times) if times else None,
+            "p95": statistics.quantiles(times, n=20, method="inclusive")[18] if len(times) > 1 else (times[0] if times else None),
+            "max": times[-1] if times else None,
+        })
+    return stats
+
+
+def print_stats(stats):
+    if not stats:
+        print("No probed writes in the timeline")
+        return
+    print("Write availability: seconds from each injection until a probe write was accepted")
+    print(f"{'type':<9}  {'target':<16}  {'probes':>6}  {'failed':>6}  {'healed':>6}  "
+          f"{'min':>7}  {'median':>7}  {'mean':>7}  {'p95':>7}  {'max':>7}")
+    for s in stats:
+        times = "  ".join(f"{s[key]:7.2f}" if s[key] is not None else f"{'-':>7}" for key in ("min", "median", "mean", "p95", "max"))
+        print(f"{s['type']:<9}  {s['target']:<16}  {s['probes']:>6}  {s['failed']:>6}  {s['after_heal']:>6}  {times}")
+
+
+def main(mode):
+    """Command line of an architecture's faultInjector.py."""
+    parser = argparse.ArgumentParser(description=f"Inject a declarative fault plan into a running {mode.name} deployment.")
+    parser.add_argument("plan", help="Fault plan (JSON).", nargs="?")
+    parser.add_argument("distconf", help="Distribution configuration the deployment was started with.",
+                        default="DistributionConfig.json", nargs="?")
+    parser.add_argument("--seed", type=int, help="Override the plan's seed.")
+    parser.add_argument("--timeline", default=TIMELINE_FILE, help="JSON lines file the injected and healed faults are appended to.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the expanded plan and exit.")
+    parser.add_argument("--stats", action="store_true", help="Print the write availability statistics of the timeline and exit.")
+    args = parser.parse_args()
+    if args.stats:
+        if not os.path.exists(args.timeline):
+            print(f"❌ No fault timeline at {args.timeline}")
+            sys.exit(1)
+        print_stats(write_stats(args.timeline))
+        return
+    if not args.plan:
+        parser.error("a fault plan is required unless --stats is given")
+
+    deploy.MODE = mode
+    deploy.PATH = args.distconf
+    topology = deploy.load_topology()
+    problem = discover_roles(topology)
+    if problem:
+        print(f"⚠️ {problem}; \"leader\" and \"followers\" cannot be used as targets")
+    elif ROLES:
+        print(f"Leader: {ROLES['leader'][0]}, followers: {', '.join(ROLES['followers']) or 'none'}")
+    with open(args.plan) as f:
+        plan = json.load(f)
+    if args.seed is not None:
+        plan["seed"] = args.seed
+    faults, problems = expand_plan(plan, topology)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print_plan(faults)
+    if args.dry_run or not faults:
+        return
+    if not docker_client().ping():
+        print(f"❌ Cannot reach the Docker daemon at {docker_client().host}")
+        sys.exit(1)
+    FaultRunner(topology, args.timeline).run(faults)
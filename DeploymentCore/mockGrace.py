@@ -0,0 +1,216 @@
+"""In-memory stand-in for a GRACE app, for testing deployment and client tooling without Docker.
+
+Serves the HTTP surface the benchmark tools use (/api/addVertex, /api/addEdge, the other
+/api/ writes, /api/getGraph, /getVertex, /reset, /ready and /health) over a graph held in
+two dicts, with the same validation and error semantics as Application/src/graph/Graph.ts:
+duplicate ids and edges between unknown vertices are rejected with a 500. Every /api/
+request can be delayed and failed at random to exercise clients' retry and backoff paths.
+/api/getGraph returns {"vertices": n, "edges": m} rather than a database row dump.
+
+Usage: python3 -m DeploymentCore.mockGrace --port 3000 [--latency-ms 2 --jitter-ms 1 --error-rate 0.01]
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class MockGraph:
+    def __init__(self):
+        self.vertices = {}
+        self.edges = {}
+        self.lock = threading.Lock()
+
+    def add_vertex(self, body):
+        properties = body.get("properties") or {}
+        if not body.get("label") or not properties.get("id"):
+            raise ValueError("Malformed request.")
+        with self.lock:
+            if properties["id"] in self.vertices:
+                raise KeyError(f'Vertex with id "{properties["id"]}" already exists')
+            self.vertices[properties["id"]] = {"label": body["label"], "properties": dict(properties)}
+        return {"label": body["label"], "properties": properties}
+
+    def add_edge(self, body):
+        properties = body.get("properties") or {}
+        required = ("sourcePropName", "sourcePropValue", "targetPropName", "targetPropValue", "relationType")
+        if not all(body.get(key) for key in required) or not properties.get("id"):
+            raise ValueError("Malformed request.")
+        source, target = body["sourcePropValue"], body["targetPropValue"]
+        with self.lock:
+            if source not in self.vertices or target not in self.vertices:
+                raise KeyError(f"Source and/or target vertex do not exist. Edge: {source} {target}")
+            if properties["id"] in self.edges:
+                raise KeyError(f'Edge with id "{properties["id"]}" already exists')
+            self.edges[properties["id"]] = {"relationType": body["relationType"], "source": source,
+                                            "target": target, "properties": dict(properties)}
+        return dict({key: body[key] for key in required}, properties=properties)
+
+    def delete_vertex(self, body):
+        vid = self._id(body)
+        with self.lock:
+            if self.vertices.pop(vid, None) is None:
+                raise KeyError(f'Vertex with id "{vid}" does not exist')
+            for eid in [eid for eid, edge in self.edges.items() if vid in (edge["source"], edge["target"])]:
+                del self.edges[eid]
+        return {"id": vid}
+
+    def delete_edge(self, body):
+        eid = self._id(body)
+        with self.lock:
+            if self.edges.pop(eid, None) is None:
+                raise KeyError("Edge with this id does not exist")
+        return {"id": eid}
+
+    def set_property(self, items, kind, body, remove=False):
+        eid = self._id(body)
+        if not body.get("key") or (not remove and body.get("value") in (None, "")):
+            raise ValueError("Malformed request.")
+        with self.lock:
+            if eid not in items:
+                raise KeyError(f"{kind} with id {eid} does not exist")
+            if remove:
+                items[eid]["properties"].pop(body["key"], None)
+                return {"id": eid, "key": body["key"]}
+            items[eid]["properties"][body["key"]] = body["value"]
+        return {"id": eid, "key": body["key"], "value": body["value"]}
+
+    def counts(self):
+        with self.lock:
+            return {"vertices": len(self.vertices), "edges": len(self.edges)}
+
+    def reset(self):
+        with self.lock:
+            self.vertices.clear()
+            self.edges.clear()
+
+    @staticmethod
+    def _id(body):
+        if not body.get("id"):
+            raise ValueError("Malformed request.")
+        return body["id"]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like express
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid the delayed-ACK stall
+    server_version = "MockGrace"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def injected(self):
+        """Apply the configured latency and random failure to an /api/ request; True if it failed."""
+        server = self.server
+        delay = server.latency + (server.rng.uniform(-server.jitter, server.jitter) if server.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and server.rng.random() < server.error_rate:
+            self.reply(server.error_status, "Injected error")
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        graph = self.server.graph
+        if url.path in ("/ready", "/health"):
+            ready = time.monotonic() >= self.server.ready_at
+            self.reply(200 if ready else 503, "OK" if ready else "Service Unavailable")
+        elif url.path == "/api/getGraph":
+            if not self.injected():
+                self.reply(200, graph.counts())
+        elif url.path == "/getVertex":
+            vid = parse_qs(url.query).get("id", [None])[0]
+            with graph.lock:
+                vertex = graph.vertices.get(vid)
+            if vertex:
+                self.reply(200, vertex)
+            else:
+                self.reply(404, {"error": "Vertex not found"})
+        else:
+            self.reply(404, "error")
+
+    def do_POST(self):
+        graph = self.server.graph
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.path == "/reset":
+            graph.reset()
+            self.reply(200, {"status": "Graph reset successful"})
+            return
+        routes = {
+            "/api/addVertex": graph.add_vertex,
+            "/api/addEdge": graph.add_edge,
+            "/api/deleteVertex": graph.delete_vertex,
+            "/api/deleteEdge": graph.delete_edge,
+            "/api/setVertexProperty": lambda body: graph.set_property(graph.vertices, "Vertex", body),
+            "/api/setEdgeProperty": lambda body: graph.set_property(graph.edges, "Edge", body),
+            "/api/removeVertexProperty": lambda body: graph.set_property(graph.vertices, "Vertex", body, remove=True),
+            "/api/removeEdgeProperty": lambda body: graph.set_property(graph.edges, "Edge", body, remove=True),
+        }
+        route = routes.get(self.path)
+        if route is None:
+            self.reply(404, "error")
+            return
+        if self.injected():
+            return
+        try:
+            body = json.loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Malformed request.")
+            self.reply(200, route(body))
+        except ValueError:
+            self.reply(500, "Malformed request.")
+        except KeyError as e:
+            self.reply(500, f"Error: {e.args[0]}")
+
+
+def make_server(port, host="127.0.0.1", latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                error_status=500, startup_s=0.0, seed=None):
+    """A ready-to-serve mock app; call serve_forever() on it."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.graph = MockGraph()
+    server.latency = latency_ms / 1000
+    server.jitter = jitter_ms / 1000
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.ready_at = time.monotonic() + startup_s
+    server.rng = random.Random(seed)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an in-memory stand-in for one GRACE app.")
+    parser.add_argument("--port", type=int, default=3000, help="Port to serve the app API on.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every /api/ request.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- variation of the delay.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of /api/ requests failed on purpose.")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures.")
+    parser.add_argument("--startup-s", type=float, default=0.0, help="Seconds /ready answers 503, like a preloading app.")
+    parser.add_argument("--seed", type=int, help="Seed for latency jitter and injected errors.")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.host, args.latency_ms, args.jitter_ms, args.error_rate,
+                         args.error_status, args.startup_s, args.seed)
+    print(f"Mock GRACE app on {args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
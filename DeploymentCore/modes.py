@@ -0,0 +1,93 @@
+"""Replication architectures the deployment engine can bring up.
+
+A mode names the per-replica stacks and containers, says which middleware image runs in
+front of each database and how it is configured, and where to probe it. Databases,
+preload, snapshots, readiness, placement, WAN shaping and teardown are shared.
+"""
+from textwrap import dedent
+
+
+class ReplicationMode:
+    name = ""
+    stack_prefix = ""  # compose project of replica n: <stack_prefix><n>
+    app_prefix = ""  # middleware container of replica n
+    network_prefix = ""  # per-replica network names, removed by force-clean
+    images = {}  # image name -> Dockerfile, built from the architecture's directory
+    app_image = ""  # entry of `images` the middleware runs
+    provider = False  # whether a wsserver provider stack can be deployed
+    ready_path = "/ready"  # HTTP readiness probe on the app port
+    counts_path = None  # GET returning {"vertices", "edges"}; None if the app has none
+    leader_env = None  # app variable holding the leader's URI; None if every replica is alike
+
+    def app_environment(self, replica, config, db_url):
+        """The app's environment block, one `KEY: value` line per variable."""
+        raise NotImplementedError
+
+    def app_networks(self, replica):
+        return ["Shared_net"]
+
+    def app_volumes(self, replica, preload_data):
+        return []
+
+
+class GraceMode(ReplicationMode):
+    """GRACE CRDT replication: replicas in datacenters, synchronised through the provider."""
+    name = "GRACE"
+    stack_prefix = "GraceReplica"
+    app_prefix = "Grace"
+    network_prefix = "Grace_net_"
+    images = {
+        "grace-app": "./Dockerfiles/GRACEDockerfile",
+        "grace-wsserver": "./Dockerfiles/WSServerDockerfile",
+    }
+    app_image = "grace-app"
+    provider = True
+    ready_path = "/ready"
+    counts_path = "/api/getGraph"
+
+    def app_environment(self, replica, config, db_url):
+        return dedent(f"""
+        WS_URI: "ws://wsserver:1234"
+        DATABASE_URI: {db_url}
+        NEO4J_USER: "{replica.user}"
+        NEO4J_PASSWORD: "{replica.password}"
+        USER: {replica.user}
+        DATABASE: {replica.database.upper()}
+        LOG_LEVEL: {replica.app_log_level}
+        IS_PRELOAD_LEADER: {"Yes" if replica.is_preload_leader else "No"}
+        REPLICA_ID: "{replica.replica_id}"
+        PEER_REPLICA_ID: "{replica.peer_replica_id}"
+        PEER_DC_ID: "{replica.peer_dc_id}"
+        DATACENTER_ID: "{replica.dc_name}"
+        ACK_LEVEL: "{config.get("ack_level", "none")}"
+        """).strip("\n")
+
+    def app_volumes(self, replica, preload_data):
+        return [f"{preload_data}:/var/lib/grace/import"]
+
+
+class LeaderFollowerMode(ReplicationMode):
+    """Leader-follower replication: the first replica takes writes and forwards them to the rest."""
+    name = "leader-follower"
+    stack_prefix = "Replica"
+    app_prefix = "Replica"
+    network_prefix = "Replica_net_"
+    images = {"grace-leaderfollower": "./Dockerfiles/wrapperdockerfile"}
+    app_image = "grace-leaderfollower"
+    ready_path = "/health"
+    leader_env = "LEADER_URI"
+
+    def app_environment(self, replica, config, db_url):
+        return dedent(f"""
+        DATABASE_URI: {db_url}
+        NEO4J_USER: "{replica.user}"
+        NEO4J_PASSWORD: "{replica.password}"
+        USER: {replica.user}
+        DATABASE: {replica.database.upper()}
+        LOG_LEVEL: {replica.app_log_level}
+        LEADER_URI: "http://{self.app_prefix}1:{config["base_app_port"]}"
+        MY_URI: "http://{replica.grace_name}:3000"
+        """).strip("\n")
+
+    def app_networks(self, replica):
+        return [f"{self.network_prefix}{replica.number}", "Shared_net"]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the request bodies primeDatabase.py generates.
+
+Encodes synthetic LDBC comment rows and forum_hasMember_person edge rows with the
+compiled body templates, and with the old per-row dict + json.dumps path for
+comparison. Exits non-zero if the template path falls below --min-rate bodies/sec.
+
+Usage: python3 BenchmarkScripts/primerBodyEncoding.py [--rows 200000] [--min-rate 100000]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from primeDatabase import compile_vertex_body, compile_edge_body
+
+COMMENT_HEADER = ["id", "creationDate", "locationIP", "browserUsed", "content", "length"]
+HAS_MEMBER_HEADER = ["Forum.id", "Person.id", "joinDate"]
+
+
+def comment_rows(n, seed=42):
+    rng = random.Random(seed)
+    words = ["about", "Gottfried", "Leibniz", "graph", "replica", "façade", "\"quoted\"", "naïve"]
+    return [
+        [
+            str(1030792151040 + i),
+            str(1262304000000 + rng.randrange(10**9)),
+            f"{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+            rng.choice(["Firefox", "Chrome", "Safari", "Internet Explorer"]),
+            " ".join(rng.choice(words) for _ in range(rng.randrange(3, 30))),
+            str(rng.randrange(200)),
+        ]
+        for i in range(n)
+    ]
+
+
+def edge_rows(n, seed=42):
+    rng = random.Random(seed)
+    return [[str(rng.randrange(10**6)), str(rng.randrange(10**6)), str(1262304000000 + i)] for i in range(n)]
+
+
+def dict_vertex_body(label, headers, row):
+    body = {"label": [label], "properties": {}}
+    for key, value in zip(headers, row):
+        if key.strip().lower() == "id":
+            body["properties"]["id"] = label + value
+        else:
+            body["properties"][key] = value
+    return json.dumps(body).encode()
+
+
+def timed(name, rows, encode):
+    # Rows are copied up front: the vertex encoder rewrites id columns in place.
+    rows = [list(r) for r in rows]
+    start = time.perf_counter()
+    for row in rows:
+        encode(row)
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed
+    print(f"{name:<28} {len(rows):>9} bodies  {elapsed:7.3f}s  {rate:>12,.0f} bodies/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark primeDatabase request body generation.")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows to encode per case.")
+    parser.add_argument("--min-rate", type=float, default=100000, help="Required bodies/sec for the template encoders.")
+    args = parser.parse_args()
+
+    comments = comment_rows(args.rows)
+    members = edge_rows(args.rows)
+
+    timed("vertex dict + json.dumps", comments, lambda row: dict_vertex_body("Comment", COMMENT_HEADER, row))
+    vertex_rate = timed("vertex template", comments, compile_vertex_body("Comment", COMMENT_HEADER))
+    edge_rate = timed("edge template", members, compile_edge_body("Forum", "HAS_MEMBER", "Person", HAS_MEMBER_HEADER))
+
+    slowest = min(vertex_rate, edge_rate)
+    if slowest < args.min_rate:
+        print(f"❌ Template encoding at {slowest:,.0f} bodies/sec is below the {args.min_rate:,.0f} target")
+        sys.exit(1)
+    print(f"✅ Template encoding sustains {slowest:,.0f} bodies/sec")
+
+
+if __name__ == "__main__":
+    main()
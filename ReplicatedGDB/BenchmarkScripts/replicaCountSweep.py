@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Run the ReplicaCountAndLatency sweep: engine x replica count x dataset x YCSB threads.
+
+Each scenario deploys GRACE through Deployment.py with one replica per datacenter, runs
+one YCSB client per replica through ycsbLauncher (all released at the same instant; the
+start times and the CPU/memory placement land in <N>.clients.json) and writes the outputs to
+Results/<experiment>/<dataset>/<DB>/<T>t/<N>.txt (extra clients: <N>_client<k>.txt), T
+being the YCSB thread count.
+
+Scenarios run in dataset, engine, replica-count order, so consecutive scenarios reuse the
+stacks Deployment.py's topology diff leaves untouched. The deployment is torn down only
+when the dataset changes. Finished scenarios are recorded in a state file, so a
+crashed sweep picks up where it stopped.
+
+Usage: python3 BenchmarkScripts/replicaCountSweep.py sweep.json [--restart] [--dry-run]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+
+GRACE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+ROOT_DIRECTORY = os.path.dirname(GRACE_DIRECTORY)
+sys.path.insert(0, GRACE_DIRECTORY)
+from Deployment import deploy
+import ycsbLauncher
+
+# Defaults for everything the matrix file does not set. Paths are relative to the repo root.
+DEFAULTS = {
+    "experiment": "ReplicaCountAndLatency",
+    "engines": {"GRACE": "memgraph"},  # results directory -> database behind GRACE
+    "replicas": [1, 2, 3],
+    "datasets": ["yeast"],
+    "threads": [1],
+    "duration": 60,
+    "results_dir": "Results",
+    "results_path": "{experiment}/{dataset}/{db}/{threads}t/{replicas}.txt",
+    "data_dir": "GraphDBData",
+    "preload_dir": "PreloadData",
+    "ycsb_dir": "YCSB",
+    "workload": "workloads/workload_grace",
+    "state_file": "Results/.replicaCountSweep.json",
+    "deployment": {
+        "base_website_port": 7474,
+        "base_protocol_port": 7687,
+        "base_app_port": 3000,
+        "base_prometheus_port": 9090,
+        "base_grafana_port": 5000,
+        "provider_port": 1234,
+        "provider": True,
+        "preload_data": True,
+        "password": "verysecretpassword",
+        "user": "pandey",
+        "app_log_level": "error",
+    },
+}
+# Dataset files copied into place before a dataset's first scenario, as RunBenchmark.sh does.
+PRELOAD_FILES = ["vertices.csv", "edges.csv", "vertices.json", "edges.json", "vertices.keys", "edges.keys"]
+YCSB_FILES = {"Vertices.loaded": "load_vertices.loaded", "Edges.loaded": "load_edges.loaded"}
+
+
+def load_matrix(path):
+    with open(path) as f:
+        matrix = json.load(f)
+    merged = dict(DEFAULTS, **matrix)
+    merged["deployment"] = dict(DEFAULTS["deployment"], **matrix.get("deployment", {}))
+    for key in ("results_dir", "data_dir", "preload_dir", "ycsb_dir", "state_file"):
+        merged[key] = os.path.join(ROOT_DIRECTORY, merged[key])
+    return merged
+
+
+def scenarios(matrix):
+    """All scenarios, ordered so that consecutive ones share as many stacks as possible."""
+    for dataset, (db, engine), replicas, threads in itertools.product(
+        matrix["datasets"], matrix["engines"].items(), sorted(matrix["replicas"]), matrix["threads"]
+    ):
+        yield {"dataset": dataset, "db": db, "engine": engine, "replicas": replicas, "threads": threads}
+
+
+def scenario_key(scenario):
+    return "{dataset}/{db}/{engine}/{replicas}r/{threads}t".format(**scenario)
+
+
+def result_path(matrix, scenario, client):
+    path = os.path.join(matrix["results_dir"], matrix["results_path"].format(experiment=matrix["experiment"], **scenario))
+    if client == 0:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_client{client}{ext}"
+
+
+def shared_results(matrix):
+    """Scenarios whose results_path is the same file as an earlier scenario's."""
+    seen, clashes = {}, []
+    for scenario in scenarios(matrix):
+        path = result_path(matrix, scenario, 0)
+        if path in seen:
+            clashes.append((scenario_key(seen[path]), scenario_key(scenario)))
+        seen.setdefault(path, scenario)
+    return clashes
+
+
+def write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_state(path, restart):
+    if restart or not os.path.exists(path):
+        return {"completed": {}, "failed": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def prepare_dataset(matrix, dataset):
+    """Put the dataset's preload and YCSB files where the deployment and the clients read them."""
+    data_dir = matrix["data_dir"]
+    copies = [(f"{dataset}_load_{name}", os.path.join(matrix["preload_dir"], name)) for name in PRELOAD_FILES]
+    copies += [(f"{dataset}_{suffix}", os.path.join(matrix["ycsb_dir"], target)) for target, suffix in YCSB_FILES.items()]
+    missing = [source for source, _ in copies if not os.path.exists(os.path.join(data_dir, source))]
+    if missing:
+        print(f"❌ {dataset}: missing {', '.join(missing)} in {data_dir} (run scripts/data-preparation/PrepareDatasets.sh)")
+        return False
+    os.makedirs(matrix["preload_dir"], exist_ok=True)
+    for source, target in copies:
+        shutil.copyfile(os.path.join(data_dir, source), target)
+    return True
+
+
+def distribution_config(matrix, scenario):
+    """Legacy `dbs` format: one datacenter per replica, as the 1and3Replicas scripts use."""
+    deployment = dict(matrix["deployment"])
+    entry = {
+        "database": scenario["engine"],
+        "password": deployment.pop("password"),
+        "user": deployment.pop("user"),
+        "app_log_level": deployment.pop("app_log_level"),
+    }
+    deployment["dataset_name"] = scenario["dataset"]
+    deployment["dbs"] = [dict(entry) for _ in range(scenario["replicas"])]
+    return deployment
+
+
+def deploy_scenario(matrix, config, config_path):
+    """Bring the deployment to the scenario's topology. Returns True when every stack is ready."""
+    write_atomic(config_path, config)
+    deploy.PATH = config_path
+    deploy.PRELOAD_DATA = matrix["preload_dir"]
+    try:
+        results = deploy.up_all()
+    except SystemExit:
+        return False
+    return all(r["rc"] == 0 for r in results)
+
+
+def teardown(config_path):
+    if not os.path.exists(config_path):
+        return
+    deploy.PATH = config_path
+    try:
+        deploy.down_all()
+    except SystemExit:
+        pass
+
+
+def run_clients(matrix, scenario, config):
+    """
+    One YCSB client per replica, released together by ycsbLauncher. Outputs are moved
+    into place only once every client succeeded.
+    """
+    topology = deploy.Topology.from_config(config)
+    paths = [result_path(matrix, scenario, client) for client in range(len(topology.replicas))]
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    clients = ycsbLauncher.topology_clients(
+        topology, [path + ".partial" for path in paths], workload=matrix["workload"], duration=matrix["duration"],
+        threads=scenario["threads"], data_dir=matrix["data_dir"], dataset=scenario["dataset"],
+    )
+    stem = os.path.splitext(paths[0])[0]
+    metadata = {"scenario": scenario}
+    if os.path.exists(deploy.PLACEMENT_FILE):
+        with open(deploy.PLACEMENT_FILE) as f:
+            metadata["placement"] = json.load(f)
+    ok = ycsbLauncher.run_clients(clients, matrix["ycsb_dir"], matrix["duration"], manifest=stem + ".clients.json",
+                                  metadata=metadata)
+    if ok:
+        for path in paths:
+            os.replace(path + ".partial", path)
+    else:
+        print(f"❌ Client failures, outputs kept as {stem}*.partial")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the replica count / latency sweep.")
+    parser.add_argument("matrix", help="Scenario matrix (JSON); see DEFAULTS for the keys.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the state file and run every scenario.")
+    parser.add_argument("--dry-run", action="store_true", help="List the scenarios that would run and exit.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show full deployment output.")
+    args = parser.parse_args()
+
+    matrix = load_matrix(args.matrix)
+    clashes = shared_results(matrix)
+    for first, second in clashes:
+        print(f"❌ {first} and {second} would write the same results; add the missing fields to results_path")
+    if clashes:
+        sys.exit(1)
+    state = load_state(matrix["state_file"], args.restart)
+    pending = [s for s in scenarios(matrix) if scenario_key(s) not in state["completed"]]
+    print(f"{len(pending)} scenario(s) to run, {len(state['completed'])} already completed")
+    if args.dry_run:
+        for scenario in pending:
+            print(f"  {scenario_key(scenario)}")
+        return
+
+    os.chdir(GRACE_DIRECTORY)  # Deployment.py works relative to its own directory
+    deploy.VERBOSE = args.verbose
+    os.makedirs(os.path.dirname(matrix["state_file"]), exist_ok=True)
+    config_path = os.path.join(GRACE_DIRECTORY, "sweep_config.json")
+    current_dataset = None
+    for scenario in pending:
+        key = scenario_key(scenario)
+        print(f"\n======== {key} ========")
+        if scenario["dataset"] != current_dataset:
+            # Stacks loaded with another dataset cannot be reused
+            teardown(config_path)
+            if not prepare_dataset(matrix, scenario["dataset"]):
+                state["failed"][key] = "dataset not prepared"
+                write_atomic(matrix["state_file"], state)
+                continue
+            current_dataset = scenario["dataset"]
+
+        start = time.time()
+        config = distribution_config(matrix, scenario)
+        if not deploy_scenario(matrix, config, config_path):
+            print(f"❌ Deployment failed for {key}")
+            state["failed"][key] = "deployment failed"
+        elif not run_clients(matrix, scenario, config):
+            state["failed"][key] = "client failed"
+        else:
+            state["completed"][key] = {"finished": time.time(), "seconds": time.time() - start}
+            state["failed"].pop(key, None)
+            print(f"✅ {key} done in {time.time() - start:.0f}s")
+        write_atomic(matrix["state_file"], state)
+
+    teardown(config_path)
+    print(f"\nCompleted {len(state['completed'])} scenario(s), {len(state['failed'])} failed")
+    for key, reason in state["failed"].items():
+        print(f"  ❌ {key}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
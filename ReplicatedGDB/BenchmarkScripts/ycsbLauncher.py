@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Start one YCSB client per GRACE replica, all at the same wall-clock instant.
+
+Each client targets its replica's app port (base_app_port + i) and database port. Clients
+are released together: at --start-at (epoch seconds), --start-in seconds from now, or
+when the --barrier file appears, so other hosts or a fault injector can join the same
+window. Client output goes straight to client_<k>.txt. Clients that overrun
+maxexecutiontime plus --grace seconds are killed. manifest.json records the command,
+wall-clock start and end, and exit code of every client.
+
+Usage: python3 BenchmarkScripts/ycsbLauncher.py DistributionConfig.json OUTDIR --dataset ldbc [--duration 60]
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+GRACE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+ROOT_DIRECTORY = os.path.dirname(GRACE_DIRECTORY)
+sys.path.insert(0, GRACE_DIRECTORY)
+from Deployment import deploy
+
+# How YCSB reaches each engine directly (DBURI), on the replica's published protocol port.
+DB_SCHEMES = {
+    "neo4j": "bolt",
+    "memgraph": "bolt",
+    "arangodb": "http",
+    "mongodb": "mongodb",
+    "janusgraph": "ws",
+}
+KILL_GRACE = 600  # seconds past maxexecutiontime before a client is killed; covers loading the dataset
+STOP_TIMEOUT = 10  # seconds between SIGTERM and SIGKILL
+
+
+def ycsb_command(replica, workload, duration, threads, data_dir, dataset, status=False):
+    """YCSB command line for one client bound to `replica`."""
+    cmd = ["bin/ycsb.sh", "run", "grace"]
+    if status:
+        cmd.append("-s")
+    return cmd + [
+        "-P", workload,
+        "-p", f"HOSTURI=http://localhost:{replica.app_port}",
+        "-p", f"DBTYPE={replica.database}",
+        "-p", f"DBURI={DB_SCHEMES[replica.database]}://localhost:{replica.protocol_port}",
+        "-p", f"maxexecutiontime={duration}",
+        "-p", f"threadcount={threads}",
+        "-p", f"loadVertexFile={data_dir}/{dataset}_load_vertices.json",
+        "-p", f"loadEdgeFile={data_dir}/{dataset}_load_edges.json",
+        "-p", f"vertexAddFile={data_dir}/{dataset}_update_vertices.json",
+        "-p", f"edgeAddFile={data_dir}/{dataset}_update_edges.json",
+    ]
+
+
+def topology_clients(topology, outputs, **kwargs):
+    """One client per replica of `topology`; outputs[k] is the k-th replica's result file."""
+    return [
+        {"name": replica.grace_name, "port": replica.app_port, "output": output,
+         "command": ycsb_command(replica, **kwargs)}
+        for replica, output in zip(topology.replicas, outputs)
+    ]
+
+
+def wait_for_start(start_at=None, barrier=None, poll=0.01):
+    """Block until the wall clock reaches `start_at` and/or the `barrier` file exists."""
+    while barrier and not os.path.exists(barrier):
+        time.sleep(poll)
+    if start_at is not None:
+        delay = start_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def run_client(client, cwd, go, deadline_after):
+    """Wait for `go`, run the client to completion or its deadline, and fill in its manifest entry."""
+    with open(client["output"], "w") as out:
+        go.wait()
+        client["start"] = time.time()
+        try:
+            # own process group: bin/ycsb.sh forks the JVM, and both must go on a kill
+            process = subprocess.Popen(client["command"], cwd=cwd, stdout=out, stderr=subprocess.STDOUT,
+                                       start_new_session=True)
+        except OSError as e:
+            out.write(f"Could not start {client['command'][0]}: {e}\n")
+            client["rc"], client["end"] = 127, time.time()
+            return
+        try:
+            client["rc"] = process.wait(timeout=deadline_after)
+        except subprocess.TimeoutExpired:
+            client["killed"] = True
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+            client["rc"] = process.wait()
+        client["end"] = time.time()
+
+
+def run_clients(clients, cwd, duration, start_at=None, barrier=None, grace=KILL_GRACE, manifest=None, metadata=None):
+    """
+    Start all clients at once and wait for them. Every client's thread opens its output
+    file before the release, so the only work left after it is the fork/exec.
+    Returns True if every client exited 0; writes `manifest` (JSON, with `metadata`
+    merged in) if given.
+    """
+    go = threading.Event()
+    for client in clients:
+        client.update({"start": None, "end": None, "rc": None, "killed": False})
+        os.makedirs(os.path.dirname(os.path.abspath(client["output"])), exist_ok=True)
+    threads = [threading.Thread(target=run_client, args=(client, cwd, go, duration + grace)) for client in clients]
+    for thread in threads:
+        thread.start()
+    wait_for_start(start_at, barrier)
+    go.set()
+    for thread in threads:
+        thread.join()
+
+    starts = [c["start"] for c in clients]
+    skew = max(starts) - min(starts) if starts else 0
+    for client in clients:
+        status = "✅" if client["rc"] == 0 else "❌"
+        note = " (killed after maxexecutiontime)" if client["killed"] else ""
+        print(f"{status} {client['name']} :{client['port']} rc={client['rc']} "
+              f"{client['end'] - client['start']:.1f}s{note} -> {client['output']}")
+    print(f"Clients started within {skew * 1000:.2f}ms of each other")
+
+    if manifest:
+        entries = [
+            {"name": c["name"], "port": c["port"], "output": c["output"], "command": c["command"],
+             "start": c["start"], "start_iso": iso(c["start"]), "end": c["end"], "end_iso": iso(c["end"]),
+             "rc": c["rc"], "killed": c["killed"]}
+            for c in clients
+        ]
+        tmp = manifest + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(dict(metadata or {}, duration=duration, start_skew=skew, clients=entries), f, indent=2)
+        os.replace(tmp, manifest)
+    return all(c["rc"] == 0 for c in clients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one YCSB client per GRACE replica, started together.")
+    parser.add_argument("distconf", help="Distribution configuration the deployment was started with.")
+    parser.add_argument("outdir", help="Directory for client_<k>.txt and manifest.json.")
+    parser.add_argument("--dataset", required=True, help="Dataset name, as in GraphDBData/<dataset>_load_vertices.json.")
+    parser.add_argument("--duration", type=int, default=60, help="maxexecutiontime passed to every client (seconds).")
+    parser.add_argument("--threads", type=int, default=1, help="YCSB threads per client.")
+    parser.add_argument("--workload", default="workloads/workload_grace", help="Workload file, relative to the YCSB directory.")
+    parser.add_argument("--ycsb-dir", default=os.path.join(ROOT_DIRECTORY, "YCSB"), help="YCSB checkout.")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIRECTORY, "GraphDBData"), help="Directory holding the workload files.")
+    parser.add_argument("--status", action="store_true", help="Pass -s to YCSB for periodic status lines.")
+    parser.add_argument("--start-at", type=float, help="Release all clients at this epoch timestamp.")
+    parser.add_argument("--start-in", type=float, help="Release all clients this many seconds from now.")
+    parser.add_argument("--barrier", help="Release all clients once this file exists.")
+    parser.add_argument("--grace", type=int, default=KILL_GRACE, help="Seconds past --duration before a client is killed.")
+    args = parser.parse_args()
+
+    with open(args.distconf) as f:
+        topology = deploy.Topology.from_config(json.load(f))
+    outputs = [os.path.join(args.outdir, f"client_{replica.number}.txt") for replica in topology.replicas]
+    clients = topology_clients(
+        topology, outputs, workload=args.workload, duration=args.duration, threads=args.threads,
+        data_dir=args.data_dir, dataset=args.dataset, status=args.status,
+    )
+    start_at = args.start_at if args.start_at is not None else (time.time() + args.start_in if args.start_in else None)
+    if start_at is not None:
+        print(f"Starting {len(clients)} clients at {iso(start_at)}")
+    ok = run_clients(clients, args.ycsb_dir, args.duration, start_at=start_at, barrier=args.barrier,
+                     grace=args.grace, manifest=os.path.join(args.outdir, "manifest.json"))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 import re
+import json
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
+parser = argparse.ArgumentParser(description="Plot throughput and latency over time with failures")
+parser.add_argument("log_file", nargs="?", default="workload.log", help="Workload log with status lines")
+parser.add_argument("--faults", help="Fault timeline (Logs/faults.jsonl from faultInjector.py) to shade")
+args = parser.parse_args()
+
 # ---------- Log Parsing ----------
-log_file = "workload.log"
+log_file = args.log_file
 
 timestamps = []
 latencies = []
@@ -31,11 +38,21 @@ df = pd.DataFrame({
 })
 
 # ---------- Failure Intervals ----------
-# Define failures: list of tuples (start_time, duration_in_seconds)
-failures = [
-    (df['Time'][3], 5),  # example: failure starts at 4th timestamp and lasts 5s
-    (df['Time'][10], 3)  # another failure
-]
+# Failures: list of tuples (start_time, duration_in_seconds), from the injector's inject/heal records
+failures = []
+if args.faults:
+    injected = {}
+    with open(args.faults) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["event"] == "start":
+                injected = {}
+            elif entry["event"] == "inject":
+                injected[entry["fault"]] = entry["at"]
+            elif entry["event"] == "heal" and entry["fault"] in injected:
+                start = datetime.fromtimestamp(injected.pop(entry["fault"]))
+                if df['Time'].min() <= start <= df['Time'].max():
+                    failures.append((start, entry["at"] - start.timestamp()))
 
 # ---------- Plot ----------
 fig, ax1 = plt.subplots(figsize=(12,6))
@@ -1,59 +1,15 @@
 #!/usr/bin/env python3
-import random
-import time
-import subprocess
+"""Inject a declarative, seeded fault plan into the running GRACE deployment.
 
-# Shared network for inter-app communication
-SHARED_NET = "Shared_net"
+Usage: python3 faultInjector.py plan.json [DistributionConfig.json] [--seed N] [--timeline Logs/faults.jsonl] [--dry-run]
+The plan format and fault types are described in DeploymentCore/faults.py.
+"""
+import os
+import sys
 
-# Fault timing
-FAULT_DURATION = 120
-COOLDOWN = 300000
-
-# Name (or prefix) of your provider container
-PROVIDER_NAME = "Provider"
-
-def run(cmd):
-    """Run a shell command and return output"""
-    print(">", " ".join(cmd))
-    try:
-        return subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
-    except subprocess.CalledProcessError as e:
-        print("⚠️ Error:", e.output.decode())
-        return None
-
-def list_replicas():
-    """List all running replica containers (names starting with 'Grace')"""
-    out = run(["docker", "ps", "--format", "{{.Names}}"])
-    if not out:
-        return []
-    return [name for name in out.splitlines() if name.startswith("Grace")]
-
-def main():
-    while True:
-        replicas = list_replicas()
-        if not replicas:
-            print("⚠️ No replicas running")
-            time.sleep(10)
-            continue
-
-        # Pick a random replica
-        replica = random.choice(replicas)
-        if(replica=="Grace1"):
-            continue
-
-        # Partition replica from shared network
-        print(f"🚫 Disconnecting {replica} from {SHARED_NET}")
-        run(["docker", "network", "disconnect", SHARED_NET, replica])
-
-        time.sleep(FAULT_DURATION)
-
-        # Heal (reconnect to network)
-        print(f"✨ Reconnecting {replica} to {SHARED_NET}")
-        run(["docker", "network", "connect", SHARED_NET, replica])
-
-        print("⏳ Cooling down...")
-        time.sleep(COOLDOWN)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from DeploymentCore import faults
+from DeploymentCore.modes import GraceMode
 
 if __name__ == "__main__":
-    main()
+    faults.main(GraceMode())
@@ -1,11 +1,16 @@
 import os
+import re
 import csv
 import sys
+import json
+import math
+import time
+import argparse
 import requests
 from tqdm import tqdm
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 session = requests.Session()
@@ -21,13 +26,19 @@ retries = Retry(
 adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100, max_retries=retries)
 session.mount("http://", adapter)
 
-logging.basicConfig(filename='error_log.txt', level=logging.ERROR, 
-                    format='%(asctime)s %(levelname)s:%(message)s')
-
 # --- CONFIG ---
 HEADERS = {"Content-Type": "application/json"}  # Customize if needed
-vertex_url = "http://localhost:3000/api/addVertex"
-edge_url = "http://localhost:3000/api/addEdge"
+APP_URL = "http://localhost:3000"
+vertex_url = APP_URL + "/api/addVertex"
+edge_url = APP_URL + "/api/addEdge"
+JOURNAL_FLUSH_EVERY = 1000  # committed rows between journal flushes
+METRICS_INTERVAL = 2  # seconds between rows/sec samples and metrics records
+MAX_IN_FLIGHT = 128  # upper bound for the adaptive concurrency controller
+TARGET_P95 = 0.25  # seconds; p95 request latency the controller tries to stay under
+LATENCY_RISE = 2  # back off once p95 exceeds this multiple of the best window
+MIN_WINDOW = 20  # fewest requests per controller decision
+# The app answers 500 for rows it refuses, not only for its own failures; these replies are final
+APP_REJECTIONS = ("already exists", "Malformed request")
 Vertices = [
     # Static
         ("Place","place_0_0.csv"),
@@ -71,132 +82,565 @@ Edges = [
     #     ("Post", "IS_LOCATED_IN", "Place", "post_isLocatedIn_place_0_0.csv")
         ]
 
-def count_lines(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return sum(1 for _ in f)
-    
+class CheckpointJournal:
+    """Records, per target and input file, the byte offset up to which every row was accepted.
+
+    The journal is a small JSON file keyed by the target (the app URL, or a deployment
+    name) and the absolute path of each CSV, so priming another deployment never
+    resumes from this one's progress. An entry is only trusted if the file's size and
+    mtime still match, so an edited dataset is primed again from the start. Without a
+    path nothing is written and every file is primed from its first row.
+    """
+
+    def __init__(self, path, target, flush_every=JOURNAL_FLUSH_EVERY):
+        self.path = path
+        self.target = target
+        self.flush_every = flush_every
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        if path and os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def entry(self, filepath):
+        """Return the journal entry for filepath, creating a fresh one if it is missing or stale."""
+        key = f"{self.target} {os.path.abspath(filepath)}"
+        st = os.stat(filepath)
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry or entry.get("size") != st.st_size or entry.get("mtime") != st.st_mtime:
+                entry = {"size": st.st_size, "mtime": st.st_mtime, "offset": 0, "rows": 0, "complete": False}
+                self.entries[key] = entry
+            return entry
+
+    def commit(self, entry, offset, rows, advanced):
+        """Move the committed offset of a file entry forward; flushes every flush_every rows."""
+        with self._lock:
+            entry["offset"] = offset
+            entry["rows"] = rows
+            self._pending += advanced
+            if self._pending < self.flush_every:
+                return
+        self.flush()
+
+    def complete(self, filepath):
+        entry = self.entry(filepath)
+        entry["complete"] = True
+        self.flush()
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._pending = 0
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+class CommitTracker:
+    """Tracks out-of-order request completions and commits the contiguous prefix of finished rows.
+
+    A row counts as finished once the app accepted it or rejected it for good (a
+    conflict or a malformed row, which a replay would only repeat). A row that still
+    failed after the retries, on a connection error or any other error status, stops
+    the committed offset, so a restart replays it and everything after it.
+    """
+
+    def __init__(self, journal, entry, offset, rows):
+        self.journal = journal
+        self.entry = entry
+        self.offset = offset
+        self.rows = rows
+        self.failed = None  # first row that must be replayed
+        self._next = 0
+        self._finished = {}
+        self._lock = threading.Lock()
+
+    def finished(self, seq, end_offset, done=True):
+        with self._lock:
+            if not done:
+                self.failed = seq if self.failed is None else min(self.failed, seq)
+                for later in [s for s in self._finished if s > seq]:
+                    del self._finished[later]
+                return
+            if self.failed is not None and seq > self.failed:
+                return
+            self._finished[seq] = end_offset
+            advanced = 0
+            while self._next in self._finished:
+                self.offset = self._finished.pop(self._next)
+                self._next += 1
+                advanced += 1
+            if not advanced:
+                return
+            self.rows += advanced
+            offset, rows = self.offset, self.rows
+        self.journal.commit(self.entry, offset, rows, advanced)
+
+
+def read_rows(csvfile, delimiter='|'):
+    """Yield (row, end_offset) for each CSV record of a binary file handle, starting at its current position."""
+    position = csvfile.tell()
+
+    def lines():
+        nonlocal position
+        for raw in iter(csvfile.readline, b''):
+            position += len(raw)
+            yield raw.decode('utf-8')
+
+    for row in csv.reader(lines(), delimiter=delimiter):
+        yield row, position
+
+
+def open_resumable(filepath, journal):
+    """Open filepath in binary mode, read its header and seek to the first uncommitted row.
+
+    Returns (csvfile, headers, first row, tracker), or None if the journal marks the file
+    as complete. The first row is None for a file without rows.
+    """
+    entry = journal.entry(filepath)
+    if entry["complete"]:
+        print(f"Skipping {filepath}, already primed ({entry['rows']} rows)")
+        return None
+    csvfile = open(filepath, 'rb')
+    headers = next(csv.reader([csvfile.readline().decode('utf-8')], delimiter='|'))
+    data_start = csvfile.tell()
+    sample = next(read_rows(csvfile), (None, None))[0]
+    csvfile.seek(data_start)
+    if entry["offset"] > csvfile.tell():
+        print(f"Resuming {filepath} at row {entry['rows']} (byte {entry['offset']})")
+        csvfile.seek(entry["offset"])
+    return csvfile, headers, sample, CommitTracker(journal, entry, csvfile.tell(), entry["rows"])
+
+
+# JSON string encoder from the stdlib C accelerator; quotes and escapes one str.
+encode_string = json.encoder.encode_basestring_ascii
+
+def _template(text):
+    """Escape a static JSON fragment for use in a %-format body template."""
+    return text.replace('%', '%%')
+
+def compile_vertex_body(label, headers):
+    """Compile the addVertex body for one CSV header into a function row -> JSON bytes.
+
+    The static parts of the body are rendered once per file; each row only encodes its
+    values and fills them into the template, producing the same document as building
+    {"label": [label], "properties": {...}} and serialising it.
+    """
+    id_columns = [idx for idx, key in enumerate(headers) if key.strip().lower() == "id"]
+    fields = ",".join(
+        _template(encode_string("id" if idx in id_columns else key)) + ":%s"
+        for idx, key in enumerate(headers)
+    )
+    template = _template('{"label":[' + encode_string(label) + '],"properties":{') + fields + "}}"
+    width = len(headers)
+
+    def encode(row):
+        if len(row) != width:
+            row = (row + [""] * width)[:width]
+        for idx in id_columns:
+            row[idx] = label + row[idx]
+        return (template % tuple(map(encode_string, row))).encode()
+
+    return encode
+
+# Values sent as JSON numbers exactly as written; anything else ("0012", "1_0", " 5") stays a string
+INT_VALUE = re.compile(r"0|-?[1-9][0-9]*")
+FLOAT_VALUE = re.compile(r"(?!-0$)-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+
+def _is_float(value):
+    return bool(FLOAT_VALUE.fullmatch(value)) and math.isfinite(float(value))
+
+def _encode_int(value):
+    return value if INT_VALUE.fullmatch(value) else encode_string(value)
+
+def _encode_float(value):
+    return value if _is_float(value) else encode_string(value)
+
+def column_encoder(value):
+    """Pick the JSON encoder for a property column from a sample value: int, float or string.
+
+    A value is numeric only if it is written the way the number itself would be, so
+    nothing is lost by sending it unquoted. A later value that is not a number of the
+    column's type is sent as a string rather than dropped.
+    """
+    if INT_VALUE.fullmatch(value):
+        return _encode_int
+    if _is_float(value):
+        return _encode_float
+    return encode_string
+
+def compile_edge_body(sourcelabel, label, targetlabel, headers, sample=None):
+    """Compile the addEdge body for one CSV header into a function row -> JSON bytes.
+
+    The first two columns are the source and target ids. Every further column becomes
+    an edge property next to the synthesised edge id, which the app's EdgeSchema
+    requires on every edge. The id spells out both endpoints and the relation type with
+    separators, so distinct edges never share one; a column named id is left out so it cannot clash with it.
+    Each column is typed once, from `sample` (the file's first row, so a resumed run
+    types it the same way) or else from the first row encoded.
+    """
+    columns = [idx for idx in range(2, len(headers)) if headers[idx].strip().lower() != "id"]
+    property_names = [headers[idx] for idx in columns]
+    template = _template(
+        '{"sourceLabel":[' + encode_string(sourcelabel) + '],'
+        '"targetLabel":[' + encode_string(targetlabel) + '],'
+        '"sourcePropName":"id","sourcePropValue":'
+    ) + "%s" + _template(',"targetPropName":"id","targetPropValue":') + "%s" + _template(
+        ',"relationType":[' + encode_string(label) + ']'
+    )
+    template += _template(',"properties":{"id":') + "%s" + "".join(
+        _template("," + encode_string(name) + ":") + "%s" for name in property_names
+    ) + "}}"
+    width = len(headers)
+    encoders = None
+
+    def encode(row):
+        nonlocal encoders
+        if len(row) != width:
+            row = (row + [""] * width)[:width]
+        source, target = row[0], row[1]
+        values = (
+            encode_string(sourcelabel + source),
+            encode_string(targetlabel + target),
+            encode_string(f"{sourcelabel}:{source}-{label}->{targetlabel}:{target}"),
+        )
+        if property_names:
+            if encoders is None:
+                encoders = [column_encoder(value) for value in typed(sample or row)]
+            values += tuple(encoder(value) for encoder, value in zip(encoders, typed(row)))
+        return (template % values).encode()
+
+    def typed(row):
+        if len(row) != width:
+            row = (row + [""] * width)[:width]
+        return [row[idx] for idx in columns]
+
+    return encode
+
+
+class PrimerMetrics:
+    """Samples request outcomes and reports rows/sec, p50/p99 latency and errors by status code.
+
+    A background thread wakes every interval, shows the sampled rows/sec on the active
+    progress bar and, when a path is given, appends a JSON line per sample ("jsonl") or
+    rewrites a Prometheus text-format file ("prom") that a node_exporter textfile
+    collector can scrape.
+    """
+
+    def __init__(self, path=None, fmt="jsonl", interval=METRICS_INTERVAL):
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self.file = None
+        self.pbar = None
+        self.controller = None
+        self.rows_total = 0
+        self.errors = {}
+        self._latencies = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._emit(self.sample())
+
+    def attach(self, filepath, pbar, controller):
+        """Report samples against filepath on pbar until the next attach."""
+        with self._lock:
+            self.file = os.path.basename(filepath)
+            self.pbar = pbar
+            self.controller = controller
+
+    def record(self, latency, status=None):
+        """Record one finished request; status is None on success, else the HTTP code or error name."""
+        with self._lock:
+            self.rows_total += 1
+            self._latencies.append(latency)
+            if status is not None:
+                self.errors[str(status)] = self.errors.get(str(status), 0) + 1
+
+    def sample(self):
+        with self._lock:
+            now = time.monotonic()
+            latencies, self._latencies = self._latencies, []
+            elapsed, self._last = now - self._last, now
+            sample = {
+                "ts": time.time(),
+                "file": self.file,
+                "rows_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+                "p50_ms": None,
+                "p99_ms": None,
+                "rows_total": self.rows_total,
+                "errors": dict(self.errors),
+                "concurrency": self.controller.limit if self.controller else None,
+            }
+            pbar = self.pbar
+        if latencies:
+            latencies.sort()
+            sample["p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 2)
+            sample["p99_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2)
+        if pbar is not None:
+            pbar.set_postfix(rows_s=sample["rows_per_sec"], p99_ms=sample["p99_ms"],
+                             in_flight=sample["concurrency"], refresh=False)
+        return sample
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._emit(self.sample())
+
+    def _emit(self, sample):
+        if not self.path:
+            return
+        if self.fmt == "prom":
+            label = f'{{file="{sample["file"]}"}}'
+            lines = [
+                "# TYPE primer_rows_per_second gauge",
+                f"primer_rows_per_second{label} {sample['rows_per_sec']}",
+                "# TYPE primer_concurrency gauge",
+                f"primer_concurrency{label} {sample['concurrency'] or 0}",
+                "# TYPE primer_rows_total counter",
+                f"primer_rows_total {sample['rows_total']}",
+                "# TYPE primer_request_latency_seconds summary",
+            ]
+            for quantile, key in (("0.5", "p50_ms"), ("0.99", "p99_ms")):
+                if sample[key] is not None:
+                    lines.append(f'primer_request_latency_seconds{{quantile="{quantile}"}} {sample[key] / 1000}')
+            lines.append("# TYPE primer_errors_total counter")
+            for status, count in sample["errors"].items():
+                lines.append(f'primer_errors_total{{status="{status}"}} {count}')
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(sample) + "\n")
+
+
+metrics = PrimerMetrics()
+concurrency_log = logging.getLogger("primer.concurrency")
+concurrency_log.propagate = False
+concurrency_log.setLevel(logging.INFO)
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests, driven by the server's observed latency.
+
+    Every window (at least as many requests as the current limit) the p95 latency is
+    compared with the target: the limit grows by one while p95 stays under target, and
+    is halved on any error, on p95 above target, or on p95 rising past LATENCY_RISE
+    times the best window seen so far. With adaptive=False the limit stays fixed.
+    """
+
+    def __init__(self, initial, maximum=MAX_IN_FLIGHT, target_p95=TARGET_P95, adaptive=True):
+        self.limit = min(initial, maximum)
+        self.maximum = maximum
+        self.target_p95 = target_p95
+        self.adaptive = adaptive
+        self._in_flight = 0
+        self._latencies = []
+        self._errors = 0
+        self._best_p95 = None
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency, ok):
+        with self._cond:
+            self._in_flight -= 1
+            if self.adaptive:
+                self._latencies.append(latency)
+                self._errors += not ok
+                if len(self._latencies) >= max(MIN_WINDOW, self.limit):
+                    self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self):
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(len(latencies) * 0.95)]
+        errors = self._errors
+        self._latencies, self._errors = [], 0
+        rising = self._best_p95 is not None and p95 > self._best_p95 * LATENCY_RISE and p95 > self.target_p95 / 2
+        previous = self.limit
+        if errors or p95 > self.target_p95 or rising:
+            self.limit = max(1, self.limit // 2)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+        self._best_p95 = p95 if self._best_p95 is None else min(self._best_p95, p95)
+        if self.limit != previous:
+            concurrency_log.info(f"{metrics.file} concurrency {previous} -> {self.limit} "
+                                 f"(p95={p95 * 1000:.1f}ms, errors={errors})")
+
+
 lock = threading.Lock()   # needed for thread-safe tqdm updates
-def send_request(url, data, pbar):
+def send_request(url, data, pbar, nbytes, controller):
+    """POST one row; returns (success, error, final), final once the row needs no replay."""
+    status = None
+    start = time.monotonic()
     try:
-        response = session.post(url, json=data, timeout=50)
+        response = session.post(url, data=data, headers=HEADERS, timeout=50)
         response.raise_for_status()
     except requests.RequestException as e:
-        return False, str(e)
+        status = e.response.status_code if e.response is not None else type(e).__name__
+        return False, str(e), rejected_for_good(e.response)
     finally:
+        latency = time.monotonic() - start
+        controller.release(latency, status is None)
+        metrics.record(latency, status)
         with lock:
-            pbar.update(1)
-    return True, None
+            pbar.update(nbytes)
+    return True, None, True
+
+def rejected_for_good(response):
+    """Whether the app refused the row itself (a conflict or a bad row), so that replaying it cannot succeed."""
+    if response is None:
+        return False
+    if 400 <= response.status_code < 500:
+        return response.status_code not in (408, 429)
+    return any(marker in response.text for marker in APP_REJECTIONS)
+
+def submit_row(executor, controller, tracker, errors, seq, start_offset, end_offset, url, body, pbar):
+    """Wait for a free in-flight slot, then send body; the row is committed once the app accepted or rejected it."""
+    def finished(future):
+        # the executor swallows exceptions raised here, so an unexpected one must still settle the row
+        try:
+            success, error, final = future.result()
+        except Exception as e:
+            success, error, final = False, f"{type(e).__name__}: {e}", False
+        if not success:
+            errors.append(error)
+            logging.error(f"[ERROR] {error}")
+        tracker.finished(seq, end_offset, final)
+
+    controller.acquire()
+    executor.submit(send_request, url, body, pbar, end_offset - start_offset, controller).add_done_callback(finished)
+
+def progress_bar(filepath, tracker, controller):
+    """Byte-based progress for filepath, starting at the tracker's committed offset."""
+    pbar = tqdm(total=os.path.getsize(filepath), initial=tracker.offset, unit="B",
+                unit_scale=True, unit_divisor=1024, desc=f"Processing {filepath}")
+    metrics.attach(filepath, pbar, controller)
+    return pbar
 
-def processVertexFile(filepath, label, max_workers=32):
-    total_lines = count_lines(filepath)
+def finish_file(filepath, journal, tracker, errors):
+    """Mark filepath as primed unless a row has to be replayed by the next run."""
+    if tracker.failed is None:
+        journal.complete(filepath)
+        print(f"Finished {filepath}, errors: {len(errors)}")
+    else:
+        journal.flush()
+        print(f"Finished {filepath}, errors: {len(errors)}; rerun to retry from row {tracker.rows}")
+
+def processVertexFile(filepath, label, journal, controller):
+    opened = open_resumable(filepath, journal)
+    if opened is None:
+        return
+    csvfile, headers, _, tracker = opened
+    encode = compile_vertex_body(label, headers)
     errors=[]
-    with open(filepath, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile, delimiter='|')
-        # headers = next(reader)
-        with tqdm(total=total_lines - 1, desc=f"Processing {filepath}") as pbarSend:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures=[]
-                for row in reader:
-                    body={}
-                    body["label"]=[label]
-                    body["properties"]={}
-                    for key, value in row.items():
-                        if key.strip().lower() == "id":
-                            body["properties"]["id"] = label+value
-                        else:
-                            body["properties"][key] = value
-                    futures.append(executor.submit(send_request, vertex_url, body, pbarSend))
-            
-            for future in as_completed(futures):
-                success, error = future.result()
-                if not success:
-                    logging.error(f"[ERROR] {error}")
-
-    print(f"Finished {filepath}, errors: {len(errors)}")
-            # for row in reader:
-            #     body={}
-            #     body["label"]=[label]
-            #     body["properties"]={}
-            #     for key, value in row.items():
-            #         if key.strip().lower() == "id":
-            #             body["properties"]["identifier"] = label+value
-            #         else:
-            #             body["properties"][key] = value
-            #     try:
-            #         response = requests.Post(vertex_url, json=body, headers=HEADERS,timeout=30)
-            #         if response.status_code != 200:
-            #             
-            #         # else:
-            #         #     print(f"[OK] {label} → {body}")
-            #     except requests.RequestException as e:
-            #             logging.error(f"[FAILED] {e}")
-                
-                # break
-
-def processEdgeFile(filepath, sourcelabel, label, targetlabel,  max_workers=8):
-    total_lines = count_lines(filepath)
-    with open(filepath, newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile, delimiter='|')
-        headers = next(reader)
-        with tqdm(total=total_lines - 1, desc=f"Processing {filepath}") as pbarSend:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures=[]
-                for row in reader:
-                    body={}
-                    body["sourceLabel"]=[sourcelabel]
-                    body["targetLabel"]=[targetlabel]
-                    body["sourcePropName"]="id"
-                    body["sourcePropValue"] = sourcelabel+row[0]
-                    body["targetPropName"]="id"
-                    body["targetPropValue"] = targetlabel+row[1]
-                    body["relationType"]=[label]
-                    if(len(headers)>2):
-
-                        ## Missing logic here: Need to add all properties to the set of props in the query.
-                        body["properties"]={}
-                        body["properties"]["id"]= sourcelabel+targetlabel+row[0]+row[1]
-                    # print(body)
-
-                    futures.append(executor.submit(send_request, edge_url, body, pbarSend))
-                    # try:
-                    #     response = requests.Post(edge_url, json=body, headers=HEADERS,timeout=30)
-                    #     if response.status_code != 200:
-                    #         logging.error(f"[ERROR {response.status_code}] {response.text}")  
-                    #     # else:
-                    #     #    print(f"[OK] {label} → {body}")
-                    # except requests.RequestException as e:
-                    #     logging.error(f"[FAILED] {e}")
-            for future in as_completed(futures):
-                success, error = future.result()
-                if not success:
-                    logging.error(f"[ERROR] {error}")
+    with csvfile:
+        with progress_bar(filepath, tracker, controller) as pbarSend:
+            with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+                start_offset = tracker.offset
+                for seq, (row, end_offset) in enumerate(read_rows(csvfile)):
+                    submit_row(executor, controller, tracker, errors, seq, start_offset, end_offset, vertex_url, encode(row), pbarSend)
+                    start_offset = end_offset
+
+    
+    finish_file(filepath, journal, tracker, errors)
+
+def processEdgeFile(filepath, sourcelabel, label, targetlabel, journal, controller):
+    opened = open_resumable(filepath, journal)
+    if opened is None:
+        return
+    csvfile, headers, sample, tracker = opened
+    encode = compile_edge_body(sourcelabel, label, targetlabel, headers, sample)
+    errors=[]
+    with csvfile:
+        with progress_bar(filepath, tracker, controller) as pbarSend:
+            with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+                start_offset = tracker.offset
+                for seq, (row, end_offset) in enumerate(read_rows(csvfile)):
+                    submit_row(executor, controller, tracker, errors, seq, start_offset, end_offset, edge_url, encode(row), pbarSend)
+                    start_offset = end_offset
+    
+    finish_file(filepath, journal, tracker, errors)
             
 def main():
-    if len(sys.argv) != 2:
-        print(f"Usage: python {sys.argv[0]} <directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Prime a GRACE deployment with the LDBC CSV files in a directory.")
+    parser.add_argument("directory", help="Directory containing the LDBC CSV files.")
+    parser.add_argument("--url", default=APP_URL, help="Base URL of the app to prime.")
+    parser.add_argument("--journal", help="Checkpoint journal to resume an interrupted run from, e.g. prime_journal.json.")
+    parser.add_argument("--deployment", help="Name of the deployment the journal records progress for; defaults to --url. Use a new one after rebuilding a deployment.")
+    parser.add_argument("--checkpoint-every", type=int, default=JOURNAL_FLUSH_EVERY, help="Flush the journal after this many committed rows.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the journal and prime every file from its first row.")
+    parser.add_argument("--metrics", help="Write rows/sec, p50/p99 latency and errors by status code to this file.")
+    parser.add_argument("--metrics-format", choices=["jsonl", "prom"], default="jsonl", help="JSON lines appended per sample, or a Prometheus text file rewritten per sample.")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL, help="Seconds between metrics samples.")
+    parser.add_argument("--vertex-concurrency", type=int, default=32, help="Initial in-flight requests for vertex files.")
+    parser.add_argument("--edge-concurrency", type=int, default=8, help="Initial in-flight requests for edge files.")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="Upper bound for the adaptive concurrency.")
+    parser.add_argument("--target-p95-ms", type=float, default=TARGET_P95 * 1000, help="p95 latency the concurrency controller keeps requests under.")
+    parser.add_argument("--edges", action="store_true", help="Also load the edge files, with all their properties, after the vertices.")
+    parser.add_argument("--fixed-concurrency", action="store_true", help="Keep the initial concurrency instead of adapting it.")
+    parser.add_argument("--concurrency-log", default="concurrency_log.txt", help="File recording every concurrency change.")
+    args = parser.parse_args()
+    logging.basicConfig(filename='error_log.txt', level=logging.ERROR,
+                        format='%(asctime)s %(levelname)s:%(message)s')
 
-    directory = sys.argv[1]
+    directory = args.directory
 
     if not os.path.isdir(directory):
         print(f"Error: '{directory}' is not a valid directory.")
         sys.exit(1)
 
+    global vertex_url, edge_url
+    url = args.url.rstrip("/")
+    vertex_url, edge_url = url + "/api/addVertex", url + "/api/addEdge"
+    if args.restart and args.journal and os.path.isfile(args.journal):
+        os.remove(args.journal)
+    journal = CheckpointJournal(args.journal, args.deployment or url, args.checkpoint_every)
+    global metrics
+    metrics = PrimerMetrics(args.metrics, args.metrics_format, args.metrics_interval)
+    metrics.start()
+    handler = logging.FileHandler(args.concurrency_log)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    concurrency_log.addHandler(handler)
+    # one pooled connection per in-flight request
+    session.mount("http://", HTTPAdapter(pool_connections=100, pool_maxsize=args.max_in_flight, max_retries=retries))
+
+    def controller(initial):
+        return AdaptiveConcurrency(initial, args.max_in_flight, args.target_p95_ms / 1000, not args.fixed_concurrency)
+
     for label,filename in Vertices:
         file = os.path.join(directory, filename)
         if os.path.isfile(file):
             print(filename)
-            processVertexFile(file,label)
+            processVertexFile(file,label,journal,controller(args.vertex_concurrency))
         else:
             print("Error: Could not find "+filename+" in the path specified")
     
-    # for sourcelabel, edgelabel, targetlabel,filename in Edges:
-    #     file = os.path.join(directory, filename)
-    #     if os.path.isfile(file):
-    #         print(filename)
-    #         processEdgeFile(file,sourcelabel, edgelabel, targetlabel)
-    #     else:
-    #         print("Error: Could not find "+filename+" in the path specified")
+    for sourcelabel, edgelabel, targetlabel,filename in (Edges if args.edges else []):
+        file = os.path.join(directory, filename)
+        if os.path.isfile(file):
+            print(filename)
+            processEdgeFile(file,sourcelabel, edgelabel, targetlabel,journal,controller(args.edge_concurrency))
+        else:
+            print("Error: Could not find "+filename+" in the path specified")
+    metrics.stop()
     
             
 if __name__ == "__main__":
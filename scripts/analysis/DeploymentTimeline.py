@@ -0,0 +1,78 @@
+import json
+import argparse
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.patches import Patch
+
+# Configuration
+PHASE_COLORS = {
+    "build": "tab:gray",
+    "snapshot": "tab:olive",
+    "clone": "tab:brown",
+    "up": "tab:pink",
+    "create": "tab:blue",
+    "healthy": "tab:green",
+    "preload": "tab:orange",
+    "ready": "tab:red",
+    "wan": "tab:purple",
+}
+
+
+def load_timeline(path: str) -> pd.DataFrame:
+    """Load Logs/timeline.json or Logs/timeline.csv as written by DeploymentCore/deploy.py."""
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = pd.DataFrame(json.load(f)["phases"])
+    else:
+        data = pd.read_csv(path)
+    if data.empty:
+        return data
+    data["ok"] = data["ok"].astype(str).str.lower() == "true"
+    return data.sort_values("start")
+
+
+def create_gantt_plot(data: pd.DataFrame, output_path: str) -> None:
+    """One row per (stack, service), one bar per phase, in order of first start."""
+    rows = list(dict.fromkeys(zip(data["stack"], data["service"])))
+    fig, ax = plt.subplots(figsize=(8, max(2.0, 0.28 * len(rows) + 1)))
+    for i, (stack, service) in enumerate(rows):
+        spans = data[(data["stack"] == stack) & (data["service"] == service)]
+        for _, span in spans.iterrows():
+            ax.barh(i, span["seconds"], left=span["offset"], height=0.6,
+                    color=PHASE_COLORS.get(span["phase"], "tab:cyan"),
+                    edgecolor="black" if not span["ok"] else None, hatch="//" if not span["ok"] else None)
+
+    ax.set_yticks(range(len(rows)))
+    ax.set_yticklabels([service if service == stack else f"{stack} / {service}" for stack, service in rows], fontsize=7)
+    ax.invert_yaxis()
+    ax.set_xlabel("Seconds since deployment start", fontsize=8)
+    ax.grid(axis="x", linestyle="--", alpha=0.7)
+
+    phases = [phase for phase in PHASE_COLORS if phase in set(data["phase"])]
+    legend_elements = [Patch(color=PHASE_COLORS[phase], label=phase) for phase in phases]
+    if not data["ok"].all():
+        legend_elements.append(Patch(facecolor="white", edgecolor="black", hatch="//", label="failed"))
+    fig.legend(handles=legend_elements, loc="upper center", bbox_to_anchor=(0.5, 1.0),
+               ncol=len(legend_elements), fontsize=8)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.93])
+    fig.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plot a deployment timeline as a Gantt chart")
+    parser.add_argument("timeline_path", help="Logs/timeline.json or Logs/timeline.csv from Deployment.py up")
+    parser.add_argument("figure_path", help="Path to output figure (e.g., BenchmarkPlots/DeploymentTimeline.png)")
+    args = parser.parse_args()
+
+    data = load_timeline(args.timeline_path)
+    if data.empty:
+        print("No data found")
+        return
+
+    create_gantt_plot(data, args.figure_path)
+
+
+if __name__ == "__main__":
+    main()
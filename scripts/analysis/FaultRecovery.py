@@ -0,0 +1,220 @@
+import json
+import re
+import argparse
+from datetime import datetime
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.patches import Patch
+
+# Configuration
+FAULT_COLORS = {
+    "partition": "tab:red",
+    "split": "tab:orange",
+    "kill": "black",
+    "pause": "tab:purple",
+    "latency": "tab:olive",
+    "loss": "tab:cyan",
+}
+
+# YCSB -s status line; the timestamp is the client's local wall clock at the end of the interval
+STATUS_LINE_RE = re.compile(
+    r"(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}:\d{3}) (?P<sec>\d+) sec: (?P<ops>\d+) operations;"
+)
+
+# Per-operation interval stats of the hdrhistogram measurement type (including FAILED ops)
+OP_STATS_RE = re.compile(
+    r"\[(?P<op>[A-Z_]+(?:-FAILED)?): Count=(?P<count>\d+), .*?Avg=(?P<avg>[\d\.]+)(?:, 50=[\d\.]+, 90=[\d\.]+, 99=(?P<p99>[\d\.]+))?"
+)
+
+
+def parse_status_lines(path: str, clock_offset: float = 0.0) -> pd.DataFrame:
+    """
+    One row per YCSB status interval: end time (epoch seconds), interval length, successful
+    ops/sec, failed ops, and the interval's p99 latency in us. The p99 is the largest
+    per-operation p99, an upper bound of the combined one. Intervals with no status line
+    (a stalled client) are filled in with zero throughput and no latency; the ops of the
+    line after such a gap count towards its last interval.
+    """
+    rows = []
+    with open(path) as f:
+        for line in f:
+            m = STATUS_LINE_RE.search(line)
+            if not m:
+                continue
+            end = datetime.strptime(m.group("ts"), "%Y-%m-%d %H:%M:%S:%f").timestamp() + clock_offset
+            ok, failed, p99 = 0, 0, []
+            for op, count, _, op_p99 in OP_STATS_RE.findall(line):
+                if op.endswith("-FAILED"):
+                    failed += int(count)
+                elif int(count) > 0:
+                    ok += int(count)
+                    if op_p99:
+                        p99.append(float(op_p99))
+            rows.append({"end": end, "elapsed": int(m.group("sec")), "ok": ok, "failed": failed,
+                         "p99": max(p99) if p99 else np.nan})
+    data = pd.DataFrame(rows)
+    if data.empty:
+        return data
+    data["interval"] = data["elapsed"].diff().fillna(data["elapsed"].iloc[0])
+    step = data["interval"][data["interval"] > 0].median()
+    data.loc[data["interval"] <= 0, "interval"] = step
+
+    filled = []
+    for _, row in data.iterrows():
+        missing = int(round(row["interval"] / step)) - 1
+        for k in range(missing, 0, -1):
+            filled.append({"end": row["end"] - k * step, "ok": 0, "failed": 0, "p99": np.nan, "interval": step})
+        filled.append({"end": row["end"], "ok": row["ok"], "failed": row["failed"], "p99": row["p99"],
+                       "interval": step if missing > 0 else row["interval"]})
+    data = pd.DataFrame(filled)
+    data["start"] = data["end"] - data["interval"]
+    data["throughput"] = data["ok"] / data["interval"]
+    return data.reset_index(drop=True)
+
+
+def load_faults(path: str) -> pd.DataFrame:
+    """One row per fault of a faults.jsonl timeline: inject and heal wall-clock times, type, target."""
+    faults, run = {}, 0
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["event"] == "start":
+                run += 1
+            elif entry["event"] in ("inject", "heal"):
+                fault = faults.setdefault((run, entry["fault"]), {
+                    "run": run, "fault": entry["fault"], "type": entry["type"], "target": entry["target"],
+                    "inject": np.nan, "heal": np.nan, "ok": True})
+                fault[entry["event"]] = entry["at"]
+                fault["ok"] &= entry["ok"]
+    return pd.DataFrame(list(faults.values()))
+
+
+def fault_metrics(series: pd.DataFrame, faults: pd.DataFrame, threshold: float = 0.2,
+                  baseline_s: float = 60, stable: int = 2) -> pd.DataFrame:
+    """
+    Per fault: the baseline (median throughput and p99 in the `baseline_s` before the
+    injection, skipping intervals that overlap another fault), time until throughput first
+    falls more than `threshold` below it, the throughput floor, time after the heal until
+    `stable` consecutive intervals are back within `threshold` of it, and the p99 inflation.
+    Times are measured to the end of a status interval, so their resolution is the interval.
+    """
+    if faults.empty:
+        return pd.DataFrame()
+    t0 = series["start"].iloc[0]
+    windows = list(zip(faults["inject"], faults["heal"].fillna(series["end"].iloc[-1])))
+    rows = []
+    for i, ((_, fault), (inject, heal)) in enumerate(zip(faults.iterrows(), windows)):
+        others = windows[:i] + windows[i + 1:]
+        clean = ~series.apply(lambda s: any(s["start"] < h and a < s["end"] for a, h in others), axis=1)
+        before = series[clean & (series["end"] <= inject) & (series["end"] > inject - baseline_s)]
+        during = series[(series["end"] > inject) & (series["start"] < heal)]
+        after = series[series["end"] > heal].reset_index(drop=True)
+        baseline = before["throughput"].median()
+        target = (1 - threshold) * baseline
+
+        degraded = during[during["throughput"] < target]
+        detect = degraded["end"].iloc[0] - inject if not degraded.empty else np.nan
+        good = (after["throughput"] >= target).astype(int)
+        recovered = good.rolling(stable).sum().shift(-(stable - 1)) == stable
+        recover = after["end"][recovered].iloc[0] - heal if recovered.any() else np.nan
+        floor = pd.concat([during, after.head(1)])["throughput"].min()
+        p99_base, p99_peak = before["p99"].median(), during["p99"].max()
+
+        rows.append({
+            "fault": fault["fault"], "type": fault["type"], "target": fault["target"],
+            "inject_s": inject - t0, "duration_s": heal - inject,
+            "baseline_ops": baseline, "floor_ops": floor, "floor_pct": 100 * floor / baseline if baseline else np.nan,
+            "detect_s": detect, "recover_s": recover,
+            "p99_base_ms": p99_base / 1000, "p99_peak_ms": p99_peak / 1000,
+            "p99_inflation": p99_peak / p99_base if p99_base else np.nan,
+            "failed_ops": int(during["failed"].sum()),
+        })
+    return pd.DataFrame(rows)
+
+
+def runs_faults(series: pd.DataFrame, faults: pd.DataFrame) -> pd.DataFrame:
+    """The faults of the timeline injected while the YCSB run was going."""
+    if faults.empty:
+        return faults
+    inside = (faults["inject"] >= series["start"].iloc[0]) & (faults["inject"] < series["end"].iloc[-1])
+    return faults[inside].sort_values("inject").reset_index(drop=True)
+
+
+def create_overlay_plot(runs: List[Tuple[str, pd.DataFrame, pd.DataFrame, pd.DataFrame]], output_path: str) -> None:
+    """One panel per run: throughput and p99 over time, fault windows shaded, recovery marked."""
+    fig, axes = plt.subplots(len(runs), 1, figsize=(6, 2.2 * len(runs)), squeeze=False)
+    for ax, (label, series, faults, metrics) in zip(axes[:, 0], runs):
+        t0 = series["start"].iloc[0]
+        ax.plot(series["end"] - t0, series["throughput"], color="tab:blue", linewidth=1)
+        ax.set_ylabel("ops/sec", fontsize=8, color="tab:blue")
+        ax.set_ylim(0, None)
+        latency = ax.twinx()
+        latency.plot(series["end"] - t0, series["p99"] / 1000, color="tab:red", linewidth=0.8, linestyle="--")
+        latency.set_yscale("log")
+        latency.set_ylabel("p99 (ms)", fontsize=8, color="tab:red")
+
+        for (_, fault), (_, row) in zip(faults.iterrows(), metrics.iterrows()):
+            start = fault["inject"] - t0
+            ax.axvspan(start, start + row["duration_s"], color=FAULT_COLORS.get(fault["type"], "gray"), alpha=0.25)
+            if not np.isnan(row["recover_s"]):
+                ax.axvline(start + row["duration_s"] + row["recover_s"], color="gray", linestyle=":", linewidth=0.8)
+
+        ax.set_title(label, fontsize=9)
+        ax.tick_params(labelsize=7)
+        latency.tick_params(labelsize=7)
+        ax.grid(True, linestyle="--", linewidth=0.5)
+    axes[-1, 0].set_xlabel("Time (sec)", fontsize=8)
+
+    types = [t for t in FAULT_COLORS if any(t in set(faults["type"]) for _, _, faults, _ in runs if not faults.empty)]
+    legend_elements = [Patch(color=FAULT_COLORS[t], alpha=0.25, label=t) for t in types]
+    if legend_elements:
+        fig.legend(handles=legend_elements, loc="upper center", bbox_to_anchor=(0.5, 1.0),
+                   ncol=len(legend_elements), fontsize=8)
+    fig.tight_layout(rect=[0, 0, 1, 0.95 if legend_elements else 1])
+    fig.savefig(output_path, dpi=300, bbox_inches="tight")
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-fault detection, throughput dip, recovery and p99 inflation")
+    parser.add_argument("--run", nargs=3, action="append", required=True, metavar=("LABEL", "STATUS_LOG", "FAULT_TIMELINE"),
+                        help="A YCSB log with -s status lines and the faults.jsonl of faultInjector.py; repeat to compare runs")
+    parser.add_argument("--table", help="Path to write the per-fault table (CSV)")
+    parser.add_argument("--figure", help="Path to output figure (e.g., BenchmarkPlots/FaultRecovery.png)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Throughput drop, as a fraction of the baseline, that counts as degraded")
+    parser.add_argument("--baseline-s", type=float, default=60, help="Seconds before each fault the baseline is taken from")
+    parser.add_argument("--stable", type=int, default=2, help="Consecutive good intervals that count as recovered")
+    parser.add_argument("--clock-offset", type=float, default=0.0, help="Seconds to add to YCSB timestamps to match the injector's clock")
+    args = parser.parse_args()
+
+    runs, tables = [], []
+    for label, status_log, timeline in args.run:
+        series = parse_status_lines(status_log, args.clock_offset)
+        if series.empty:
+            print(f"No status lines found in {status_log}")
+            continue
+        faults = runs_faults(series, load_faults(timeline))
+        if faults.empty:
+            print(f"No faults of {timeline} fall within {status_log}")
+        metrics = fault_metrics(series, faults, args.threshold, args.baseline_s, args.stable)
+        runs.append((label, series, faults, metrics))
+        if not metrics.empty:
+            tables.append(metrics.assign(run=label))
+
+    if not runs:
+        print("No data found")
+        return
+    if tables:
+        table = pd.concat(tables, ignore_index=True)
+        table = table[["run"] + [c for c in table.columns if c != "run"]]
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+        if args.table:
+            table.to_csv(args.table, index=False)
+    if args.figure:
+        create_overlay_plot(runs, args.figure)
+
+
+if __name__ == "__main__":
+    main()
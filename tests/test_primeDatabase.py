@@ -0,0 +1,109 @@
+"""Resume logic of the primer: which rows the checkpoint journal lets a restarted run skip."""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ReplicatedGDB"))
+import primeDatabase as primer
+
+CSV = "id|name\n1|a\n2|b\n3|c\n4|d\n"
+
+
+def journal_and_csv(tmp_path, flush_every=1):
+    csv_path = tmp_path / "place_0_0.csv"
+    csv_path.write_text(CSV)
+    journal = primer.CheckpointJournal(str(tmp_path / "journal.json"), "http://localhost:3000", flush_every)
+    return journal, str(csv_path)
+
+
+def row_offsets(path):
+    """End offset of every data row of the CSV."""
+    with open(path, "rb") as f:
+        f.readline()
+        return [offset for _, offset in primer.read_rows(f)]
+
+
+def test_out_of_order_completions_commit_the_contiguous_prefix(tmp_path):
+    journal, path = journal_and_csv(tmp_path)
+    entry = journal.entry(path)
+    tracker = primer.CommitTracker(journal, entry, 0, 0)
+    ends = row_offsets(path)
+
+    tracker.finished(2, ends[2])
+    tracker.finished(1, ends[1])
+    assert (entry["offset"], entry["rows"]) == (0, 0)
+
+    tracker.finished(0, ends[0])
+    assert (entry["offset"], entry["rows"]) == (ends[2], 3)
+    tracker.finished(3, ends[3])
+    assert (entry["offset"], entry["rows"]) == (ends[3], 4)
+
+
+def test_a_failed_row_stops_the_committed_offset(tmp_path):
+    journal, path = journal_and_csv(tmp_path)
+    entry = journal.entry(path)
+    tracker = primer.CommitTracker(journal, entry, 0, 0)
+    ends = row_offsets(path)
+
+    tracker.finished(2, ends[2])
+    tracker.finished(1, ends[1], done=False)
+    tracker.finished(0, ends[0])
+    tracker.finished(3, ends[3])
+
+    assert tracker.failed == 1
+    assert (entry["offset"], entry["rows"]) == (ends[0], 1)
+
+
+def test_a_restart_resumes_after_the_committed_rows(tmp_path):
+    journal, path = journal_and_csv(tmp_path)
+    tracker = primer.CommitTracker(journal, journal.entry(path), 0, 0)
+    ends = row_offsets(path)
+    tracker.finished(0, ends[0])
+    tracker.finished(1, ends[1])
+
+    restarted = primer.CheckpointJournal(journal.path, journal.target)
+    csvfile, headers, sample, resumed = primer.open_resumable(path, restarted)
+    with csvfile:
+        rows = [row for row, _ in primer.read_rows(csvfile)]
+
+    assert headers == ["id", "name"] and sample == ["1", "a"]
+    assert (resumed.offset, resumed.rows) == (ends[1], 2)
+    assert rows == [["3", "c"], ["4", "d"]]
+
+
+def test_completed_files_are_skipped_only_for_the_same_target(tmp_path):
+    journal, path = journal_and_csv(tmp_path)
+    journal.complete(path)
+
+    assert primer.open_resumable(path, primer.CheckpointJournal(journal.path, journal.target)) is None
+    other = primer.CheckpointJournal(journal.path, "rebuilt")
+    csvfile, _, _, tracker = primer.open_resumable(path, other)
+    csvfile.close()
+    assert (tracker.offset, tracker.rows) == (len("id|name\n"), 0)
+
+
+def test_a_changed_file_invalidates_its_entry(tmp_path):
+    journal, path = journal_and_csv(tmp_path)
+    tracker = primer.CommitTracker(journal, journal.entry(path), 0, 0)
+    tracker.finished(0, row_offsets(path)[0])
+    stat = os.stat(path)
+
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert primer.CheckpointJournal(journal.path, journal.target).entry(path)["rows"] == 0
+
+    with open(path, "a") as f:
+        f.write("5|e\n")
+    entry = primer.CheckpointJournal(journal.path, journal.target).entry(path)
+    assert (entry["offset"], entry["rows"], entry["complete"]) == (0, 0, False)
+
+
+def test_the_journal_is_flushed_every_flush_every_rows(tmp_path):
+    journal, path = journal_and_csv(tmp_path, flush_every=2)
+    tracker = primer.CommitTracker(journal, journal.entry(path), 0, 0)
+    ends = row_offsets(path)
+
+    tracker.finished(0, ends[0])
+    assert not os.path.exists(journal.path)
+    tracker.finished(1, ends[1])
+    with open(journal.path) as f:
+        assert [entry["rows"] for entry in json.load(f).values()] == [2]
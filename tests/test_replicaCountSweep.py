@@ -0,0 +1,66 @@
+"""Smoke test of the replica count sweep: deployment stubbed out, YCSB replaced by a script."""
+import os
+import sys
+import json
+import stat
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ReplicatedGDB", "BenchmarkScripts"))
+import replicaCountSweep as sweep
+
+FAKE_YCSB = """#!/bin/sh
+echo "2025-01-01 00:00:01:000 1 sec: 10 operations; 10 current ops/sec; $*"
+"""
+
+
+def test_main_runs_every_scenario(tmp_path, monkeypatch):
+    data_dir, ycsb_dir = tmp_path / "data", tmp_path / "ycsb"
+    data_dir.mkdir()
+    (ycsb_dir / "bin").mkdir(parents=True)
+    script = ycsb_dir / "bin" / "ycsb.sh"
+    script.write_text(FAKE_YCSB)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    for name in sweep.PRELOAD_FILES:
+        (data_dir / f"yeast_load_{name}").write_text("")
+    for suffix in sweep.YCSB_FILES.values():
+        (data_dir / f"yeast_{suffix}").write_text("")
+    matrix = {
+        "replicas": [1, 2], "duration": 1, "results_dir": str(tmp_path / "Results"), "data_dir": str(data_dir),
+        "preload_dir": str(tmp_path / "preload"), "ycsb_dir": str(ycsb_dir),
+        "state_file": str(tmp_path / "Results" / "state.json"),
+    }
+    matrix_path = tmp_path / "matrix.json"
+    matrix_path.write_text(json.dumps(matrix))
+
+    calls = []
+    monkeypatch.setattr(sweep, "GRACE_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(sweep.deploy, "PLACEMENT_FILE", str(tmp_path / "placement.json"))
+    monkeypatch.setattr(sweep.deploy, "up_all", lambda: calls.append(("up", sweep.deploy.PATH)) or [{"rc": 0}])
+    monkeypatch.setattr(sweep.deploy, "down_all", lambda: calls.append(("down", sweep.deploy.PATH)))
+    monkeypatch.setattr(sys, "argv", ["replicaCountSweep.py", str(matrix_path)])
+    monkeypatch.chdir(tmp_path)
+
+    sweep.main()
+
+    config_path = str(tmp_path / "sweep_config.json")
+    assert [call for call in calls if call[0] == "up"] == [("up", config_path)] * 2
+    state = json.loads((tmp_path / "Results" / "state.json").read_text())
+    assert sorted(state["completed"]) == ["yeast/GRACE/memgraph/1r/1t", "yeast/GRACE/memgraph/2r/1t"]
+    assert not state["failed"]
+    results = tmp_path / "Results" / "ReplicaCountAndLatency" / "yeast" / "GRACE" / "1t"
+    assert "HOSTURI=http://localhost:3001" in (results / "2_client1.txt").read_text()
+    assert json.loads((results / "2.clients.json").read_text())["scenario"]["replicas"] == 2
+
+
+def test_matrix_with_indistinct_results_path_is_rejected(tmp_path, monkeypatch):
+    matrix_path = tmp_path / "matrix.json"
+    matrix_path.write_text(json.dumps({"threads": [1, 4], "results_path": "{experiment}/{dataset}/{db}/{replicas}.txt"}))
+    monkeypatch.setattr(sys, "argv", ["replicaCountSweep.py", str(matrix_path), "--dry-run"])
+
+    with pytest.raises(SystemExit):
+        sweep.main()
+
+    matrix = sweep.load_matrix(str(matrix_path))
+    assert ("yeast/GRACE/memgraph/1r/1t", "yeast/GRACE/memgraph/1r/4t") in sweep.shared_results(matrix)
+    assert not sweep.shared_results(dict(matrix, results_path=sweep.DEFAULTS["results_path"]))